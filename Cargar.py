@@ -4,7 +4,7 @@ from monthlypowerconsumptions import MonthlyPowerConsumptions
 from hourlypowerconsumptions import HourlyPowerConsumptions
 from gdp import GDP
 from population import Population
-from unemployment import Unemployment
+from eurostat import EurostatIndicator
 
 # Plots
 import matplotlib.pyplot as plt
@@ -45,7 +45,7 @@ mpc = MonthlyPowerConsumptions(dir_path, patternM, skiprows=7)
 inflation = Inflation(dir_path_inflation, inflation_file)
 gdp = GDP(dir_gdp, filegdp)
 pop = Population(dir_pop, filepop)
-un = Unemployment(dir_un, fileun)
+un = EurostatIndicator(dir_un, fileun, indicator='unemployment')
 
 # Hourly consumption
 hpc = HourlyPowerConsumptions(dir_path, patternH, save=True)
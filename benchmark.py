@@ -0,0 +1,348 @@
+"""
+This module provides a benchmark of the loading and the queries of the power
+consumptions. It writes synthetic files with the same layout than the ones
+from https://www.entsoe.eu/ (hourly files per country and month with the
+change of hour columns and 'n.a.' cells, monthly files per year) and saves
+the times as JSON, so the results of two versions can be compared.
+Everything runs offline:
+
+python benchmark.py --countries 5 --years 3 --output bench.json
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# command line arguments
+import argparse
+# results output
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+# timing
+import time
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# classes to benchmark
+from hourlypowerconsumptions import HourlyPowerConsumptions
+from monthlypowerconsumptions import MonthlyPowerConsumptions
+from forecast import DemandForecast
+
+# country codes used by the synthetic files, more countries get made up codes
+COUNTRIES = ['ES', 'PT', 'FR', 'DE', 'IT', 'BE', 'NL', 'AT', 'CH', 'PL',
+             'CZ', 'SK', 'HU', 'SI', 'RO', 'GR', 'DK', 'SE', 'NO', 'FI']
+
+# rows before the data block on each kind of file
+HOURLY_SKIPROWS = 9
+MONTHLY_SKIPROWS = 7
+
+
+def country_codes(num_countries):
+    """
+    This function gives the codes of the synthetic countries
+    @param num_countries: number of countries
+    @return: list of country codes. Ex: ['ES', 'PT', 'FR']
+    """
+    codes = COUNTRIES[:num_countries]
+    for i in range(len(codes), num_countries):
+        codes.append('X%d' % i)
+    return codes
+
+
+def _last_sunday(year, month):
+    """
+    Date of the last Sunday of a month, when the hour changes in Europe
+    """
+    days = pd.date_range('%d-%02d-01' % (year, month), periods=31, freq='D')
+    days = days[days.month == month]
+    return days[days.weekday == 6][-1]
+
+
+def write_hourly_file(file_name, country, year, month, rng):
+    """
+    This function writes a synthetic hourly consumption file of a country
+    and a month. On March the 3:00 of the day the hour changes is 'n.a.' and
+    on October there are the 3A:00 and 3B:00 columns
+    @param file_name: The excel file to be written
+    @param country: country code
+    @param year: year of the file
+    @param month: month of the file
+    @param rng: numpy random generator
+    @return: n/a
+    """
+    days = pd.date_range('%d-%02d-01' % (year, month), periods=31, freq='D')
+    days = days[days.month == month]
+
+    hours = ['%02d:00:00' % hour for hour in range(1, 25)]
+    if month == 10:
+        hours = hours[:2] + ['3A:00:00', '3B:00:00'] + hours[3:]
+
+    # daily shape, lower consumption on weekends and some noise
+    shape = 1 + 0.3 * np.sin(np.linspace(-np.pi / 2, 3 * np.pi / 2, 24))
+    level = 20000 + 10000 * rng.random_sample()
+    weekend = np.where(days.weekday >= 5, 0.8, 1.0)
+    values = (level * weekend[:, np.newaxis] * shape[np.newaxis, :] *
+              rng.normal(1, 0.02, (len(days), 24))).round(0)
+
+    data = pd.DataFrame(values, columns=[hour for hour in hours
+                                         if hour != '3B:00:00'])
+    data = data.astype(object)
+
+    dst_day = np.asarray(days == _last_sunday(year, month))
+    if month == 3:
+        data.loc[dst_day, '03:00:00'] = 'n.a.'
+    if month == 10:
+        data['3B:00:00'] = np.where(dst_day, data['3A:00:00'], None)
+        data = data[hours]
+
+    # some cells without data
+    missing = rng.random_sample(len(days)) < 0.01
+    data.loc[missing, hours[-1]] = 'n.a.'
+
+    data.insert(0, 'Day', [day.strftime('%Y-%m-%d') for day in days])
+    data.insert(0, 'Country', country)
+
+    header = pd.DataFrame([['Hourly load values'], [None],
+                           ['Year:', year], ['Month:', month]] +
+                          [[None]] * (HOURLY_SKIPROWS - 4))
+    with pd.ExcelWriter(file_name) as writer:
+        header.to_excel(writer, sheet_name='Statistics', header=False,
+                        index=False)
+        data.to_excel(writer, sheet_name='Statistics',
+                      startrow=HOURLY_SKIPROWS, index=False)
+
+
+def write_monthly_file(file_name, countries, year, rng, gaps=True):
+    """
+    This function writes a synthetic monthly consumption file of a year
+    @param file_name: The excel file to be written
+    @param countries: list of country codes
+    @param year: year of the file
+    @param rng: numpy random generator
+    @param gaps: True to leave some January values without data ('n.a.')
+    @return: n/a
+    """
+    values = (rng.uniform(1000, 30000, (len(countries), 1)) *
+              rng.normal(1, 0.1, (len(countries), 12))).round(1)
+
+    data = pd.DataFrame(values, columns=list(range(1, 13))).astype(object)
+    data['Sum'] = values.sum(axis=1)
+    missing = rng.random_sample(len(countries)) < 0.05
+    if gaps:
+        data.iloc[missing, 0] = 'n.a.'
+    data.insert(0, 'Country', countries)
+
+    header = pd.DataFrame([['Monthly consumption'], [None],
+                           ['Year:', year]] +
+                          [[None]] * (MONTHLY_SKIPROWS - 3))
+    with pd.ExcelWriter(file_name) as writer:
+        header.to_excel(writer, sheet_name='Statistics', header=False,
+                        index=False)
+        data.to_excel(writer, sheet_name='Statistics',
+                      startrow=MONTHLY_SKIPROWS, index=False)
+
+
+def generate(dir_path, num_countries=3, num_years=2, first_year=2010,
+             seed=0):
+    """
+    This function writes the synthetic hourly and monthly files
+    @param dir_path: directory for the files
+    @param num_countries: number of countries
+    @param num_years: number of years
+    @param first_year: first year of the files
+    @param seed: seed of the random values
+    @return: tuple with (list of countries, list of years)
+    """
+    rng = np.random.RandomState(seed)
+    countries = country_codes(num_countries)
+    years = list(range(first_year, first_year + num_years))
+
+    if not os.path.isdir(dir_path):
+        os.makedirs(dir_path)
+
+    for year in years:
+        # the first year is complete, so every country has data of all the
+        # months on some year
+        write_monthly_file(os.path.join(dir_path, 'Monthly_%d.xlsx' % year),
+                           countries, year, rng, gaps=year != first_year)
+        for country in countries:
+            for month in range(1, 13):
+                write_hourly_file(os.path.join(
+                    dir_path, 'Hourly_%s_%d_%02d.xlsx' % (country, year,
+                                                         month)),
+                    country, year, month, rng)
+
+    return countries, years
+
+
+class _Quiet(object):
+    """
+    Hide the printed file names while the functions are timed
+    """
+    def __enter__(self):
+        self.stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+
+    def __exit__(self, *args):
+        sys.stdout.close()
+        sys.stdout = self.stdout
+
+
+def time_function(function, repeat=3):
+    """
+    This function times a function several times
+    @param function: function without arguments
+    @param repeat: number of times the function is run
+    @return: dictionary with the 'best' and 'mean' times in seconds or the
+    'error' if the function fails
+    """
+    times = []
+    try:
+        for i in range(repeat):
+            start = time.time()
+            with _Quiet():
+                function()
+            times.append(time.time() - start)
+    except Exception as error:
+        return {'error': '%s: %s' % (type(error).__name__, error)}
+
+    return {'best': min(times), 'mean': sum(times) / len(times),
+            'repeat': repeat}
+
+
+def run(dir_path, countries, years, repeat=3, workers=1):
+    """
+    This function times the loading and the queries on the files of a
+    directory, see generate
+    @param dir_path: directory with the files, it ends with a separator
+    @param countries: list of countries used on the queries
+    @param years: list of years of the files
+    @param repeat: number of times each function is run
+    @param workers: number of processes used to parse the hourly files
+    @return: dictionary name -> times, see time_function
+    """
+    # the constructors parse the files, the forecast is fitted on its own
+    # timed functions so an error there is only reported by them
+    try:
+        with _Quiet():
+            hpc = HourlyPowerConsumptions(dir_path, 'Hourly_*.xlsx',
+                                          skiprows=HOURLY_SKIPROWS,
+                                          save=False, workers=workers)
+            mpc = MonthlyPowerConsumptions(dir_path, 'Monthly_*.xlsx',
+                                           skiprows=MONTHLY_SKIPROWS,
+                                           save=False)
+    except Exception as error:
+        return {'setup': {'error': '%s: %s' % (type(error).__name__, error)}}
+
+    year = years[-1]
+    num_years = len(years)
+
+    def daily_aggregates():
+        # the memoized results are not timed
+        hpc.clear_aggregates_cache()
+        hpc.get_daily_aggregates_countries(countries, year, num_years)
+
+    # last fitted model, the forecast is timed apart from its fit
+    models = []
+
+    def fit_forecast():
+        hpc.clear_aggregates_cache()
+        models[:] = [DemandForecast(hpc, mpc, countries)]
+        return models[0]
+
+    def forecast():
+        model = models[0] if models else fit_forecast()
+        model.forecast(year + 1)
+
+    functions = [
+        ('hourly.load_dataframe',
+         lambda: hpc.load_dataframe(dir_path, 'Hourly_*.xlsx',
+                                    skiprows=HOURLY_SKIPROWS, save=False,
+                                    workers=workers)),
+        ('hourly.get_daily_aggregates_countries', daily_aggregates),
+        ('hourly.get_hourly_prototype_countries',
+         lambda: hpc.get_hourly_prototype_countries(countries, year,
+                                                    num_years)),
+        ('hourly.get_hourly_prototype_weekday_countries',
+         lambda: hpc.get_hourly_prototype_weekday_countries(
+             'Monday', countries, year, num_years)),
+        ('monthly.load_dataframe',
+         lambda: mpc.load_dataframe(dir_path, 'Monthly_*.xlsx',
+                                    skiprows=MONTHLY_SKIPROWS, save=False)),
+        ('monthly.data_normalization',
+         lambda: mpc.data_normalization(year=True)),
+        ('monthly.data_normalization_month',
+         lambda: mpc.data_normalization(year=False)),
+        ('monthly.get_average_monthly_data',
+         lambda: mpc.get_average_monthly_data()),
+        ('forecast.fit', fit_forecast),
+        ('forecast.forecast', forecast)]
+
+    return dict((name, time_function(function, repeat))
+                for name, function in functions)
+
+
+def main(argv=None):
+    """
+    Command line entry point, see the module help
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--countries', type=int, default=3,
+                        help='number of synthetic countries')
+    parser.add_argument('--years', type=int, default=2,
+                        help='number of synthetic years')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='times each function is run')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes used to parse the hourly files')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the synthetic values')
+    parser.add_argument('--data', default=None,
+                        help='directory for the synthetic files, a '
+                             'temporary one is used and removed if not given')
+    parser.add_argument('--output', default=None,
+                        help='JSON file for the results, printed if not '
+                             'given')
+    args = parser.parse_args(argv)
+
+    dir_path = args.data or tempfile.mkdtemp(prefix='demand-benchmark-')
+    try:
+        start = time.time()
+        countries, years = generate(dir_path, args.countries, args.years,
+                                    seed=args.seed)
+        generate_time = time.time() - start
+
+        results = run(os.path.join(dir_path, ''), countries, years,
+                      args.repeat, args.workers)
+    finally:
+        if args.data is None:
+            shutil.rmtree(dir_path)
+
+    report = {'config': {'countries': args.countries, 'years': args.years,
+                         'repeat': args.repeat, 'workers': args.workers,
+                         'seed': args.seed},
+              'environment': {'python': platform.python_version(),
+                              'pandas': pd.__version__,
+                              'numpy': np.__version__,
+                              'platform': platform.platform()},
+              'generate': generate_time,
+              'results': results}
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+    return report
+
+
+if __name__ == '__main__':
+    # the run fails if any function failed
+    sys.exit(int(any('error' in result
+                     for result in main()['results'].values())))
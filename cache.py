@@ -0,0 +1,177 @@
+"""
+This module provides a small cache to save parsed data frames on disk and
+load them again only while the source files did not change
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# hashing of the cache keys
+import hashlib
+import os
+# temporary files for atomic writes
+import binascii
+import errno
+# cache hits and misses messages
+import logging
+
+logger = logging.getLogger('cache')
+
+# cache hits and misses since the module was loaded
+_stats = {'hits': 0, 'misses': 0}
+
+
+def file_stamp(file_name):
+    """
+    This function gets the information used to know if a file changed
+    @param file_name: The file to check
+    @return: tuple with (path, modification time, size), time and size are
+    None if the file does not exist
+    """
+    if not os.path.isfile(file_name):
+        return (os.path.abspath(file_name), None, None)
+
+    info = os.stat(file_name)
+    return (os.path.abspath(file_name), info.st_mtime, info.st_size)
+
+
+def cache_key(file_names, **params):
+    """
+    This function computes the key of a cached data frame from the source
+    files (path, modification time and size) and the parse parameters
+    @param file_names: list of source files
+    @param params: parameters used to parse the files
+    @return: string with the hexadecimal key
+    """
+    digest = hashlib.sha1()
+
+    for stamp in sorted(file_stamp(file_name) for file_name in file_names):
+        digest.update(repr(stamp).encode('utf-8'))
+
+    for name in sorted(params):
+        digest.update(repr((name, params[name])).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def load(dir_path, name, key):
+    """
+    This function loads a cached data frame if it was saved with the same key
+    @param dir_path: The path where the cache is saved
+    @param name: name of the cache file. Ex: 'hconsum'
+    @param key: key of the data that is wanted, see cache_key
+    @return: the data frame or None if it is not in the cache or it is stale
+    """
+    path = os.path.join(dir_path, name)
+
+    entry = None
+    if os.path.isfile(path):
+        try:
+            entry = pd.read_pickle(path)
+        except Exception:
+            # a broken or old format cache is the same as no cache
+            entry = None
+
+    if isinstance(entry, dict) and entry.get('key') == key:
+        _stats['hits'] += 1
+        logger.debug('cache hit: %s', path)
+        return entry['df']
+
+    _stats['misses'] += 1
+    logger.debug('cache miss: %s', path)
+    return None
+
+
+def save(dir_path, name, key, df):
+    """
+    This function saves a data frame on the cache. The file is first written
+    with a temporary name and then renamed, so a reader never finds half a file
+    @param dir_path: The path where the cache is saved
+    @param name: name of the cache file. Ex: 'hconsum'
+    @param key: key of the data, see cache_key
+    @param df: data frame to save
+    @return: n/a
+    """
+    path = os.path.join(dir_path, name)
+
+    fd, tmp_path = _temporary_file(dir_path, name)
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            pd.to_pickle({'key': key, 'df': df}, tmp_file)
+        # os.replace also overwrites on windows, os.rename in python 2
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _temporary_file(dir_path, name):
+    """
+    Create a new file for writing next to the cache file. Unlike mkstemp
+    (only readable by the owner) it gets the mode of the umask, as the files
+    written by to_pickle
+    @return: tuple with (file descriptor, path)
+    """
+    while True:
+        tmp_path = os.path.join(dir_path, '.%s.%s' % (
+            name, binascii.hexlify(os.urandom(6)).decode('ascii')))
+        try:
+            return os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL |
+                           getattr(os, 'O_BINARY', 0), 0o666), tmp_path
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+
+
+def make_parts(file_names, parts):
+    """
+    This function builds the per file entries used for incremental loads
+    @param file_names: list of source files
+    @param parts: dictionary with the data parsed from each file, a data frame
+    or a dictionary with the data frame and more information of the file.
+    Ex: {file_name: {'df': df, 'rollups': rollups}}
+    @return: dictionary file name -> {'stamp': file_stamp, 'df': data frame,
+    more information...}
+    """
+    entries = {}
+    for file_name in file_names:
+        part = parts[file_name]
+        if not isinstance(part, dict):
+            part = {'df': part}
+
+        entries[file_name] = dict(part)
+        entries[file_name]['stamp'] = file_stamp(file_name)
+    return entries
+
+
+def changed_files(parts, file_names):
+    """
+    This function selects the files that are new or changed since their
+    entry was saved
+    @param parts: dictionary built by make_parts
+    @param file_names: list of source files
+    @return: list with the files that must be parsed again, in the same order
+    """
+    return [file_name for file_name in file_names
+            if file_name not in parts or
+            parts[file_name]['stamp'] != file_stamp(file_name)]
+
+
+def stats():
+    """
+    This function gets the number of cache hits and misses
+    @return: dictionary with the 'hits' and 'misses' counters
+    """
+    return dict(_stats)
+
+
+def reset_stats():
+    """
+    This function sets the cache hits and misses counters to zero
+    @return: n/a
+    """
+    _stats['hits'] = 0
+    _stats['misses'] = 0
@@ -0,0 +1,86 @@
+"""
+This module provides functions to derive calendar information (weekday,
+month, year, ISO week, day of the year, holidays) from a column of dates
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+
+# calendar features that can be derived and their compact data types
+FEATURES = {'weekday': 'int8', 'month': 'int8', 'year': 'int16',
+            'isoweek': 'int8', 'dayofyear': 'int16', 'holiday': 'bool'}
+
+# features added by default, the ones used by the consumption data frames
+DEFAULT_FEATURES = ('weekday', 'month', 'year')
+
+
+def _isoweek(dates):
+    """
+    ISO week number of a datetime series, Series.dt.week was replaced by
+    Series.dt.isocalendar() on recent pandas versions
+    """
+    if hasattr(dates.dt, 'isocalendar'):
+        return dates.dt.isocalendar().week
+    return dates.dt.week
+
+
+def _holidays(df, dates, holidays, country_column):
+    """
+    Boolean series that flags the dates that are holidays
+    """
+    if holidays is None:
+        return pd.Series(False, index=df.index)
+
+    days = dates.dt.normalize()
+
+    # the same holidays for all the rows
+    if not isinstance(holidays, dict):
+        return days.isin(pd.to_datetime(list(holidays)))
+
+    # holidays of each country
+    flags = pd.Series(False, index=df.index)
+    for country, country_holidays in holidays.items():
+        rows = (df[country_column] == country).values
+        flags[rows] = days[rows].isin(pd.to_datetime(list(country_holidays)))
+    return flags
+
+
+def add_date_features(df, column='date', features=DEFAULT_FEATURES,
+                      holidays=None, country_column='Country'):
+    """
+    This function adds to a data frame new columns with calendar information
+    derived from a column of dates, using vectorized operations
+    @param df: data frame with the dates, it is changed
+    @param column: name of the column with the dates
+    @param features: list with the features to add, see FEATURES. Ex:
+    ('weekday', 'month', 'year', 'isoweek', 'dayofyear', 'holiday')
+    @param holidays: list of dates that are holidays for all the rows or a
+    dictionary country -> list of dates, used by the 'holiday' feature
+    @param country_column: column with the country when holidays is a
+    dictionary
+    @return: the data frame with the new columns
+    """
+    dates = pd.to_datetime(df[column])
+
+    for feature in features:
+        if feature == 'weekday':
+            values = dates.dt.weekday
+        elif feature == 'month':
+            values = dates.dt.month
+        elif feature == 'year':
+            values = dates.dt.year
+        elif feature == 'isoweek':
+            values = _isoweek(dates)
+        elif feature == 'dayofyear':
+            values = dates.dt.dayofyear
+        elif feature == 'holiday':
+            values = _holidays(df, dates, holidays, country_column)
+        else:
+            raise ValueError("Unknown date feature: " + str(feature))
+
+        df[feature] = values.astype(FEATURES[feature])
+
+    return df
@@ -1 +1 @@
-from monthlypowerconsumptions import MonthlyPowerConsumptionsimport visualizations as visualfrom inflation import Inflationfrom gdp import GDPfrom population import Populationfrom unemployment import Unemploymentdir_gdp = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_GDP/"#filegdp = "tec00114"filegdp = "tec00115"filepop = "tps00001"dir_pop = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Population/"fileun = "tsdec450"dir_un = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Unemployment/"dir_path = "/Users/marta/Box Sync/ProjecteFinal/all-country-data"patternM = "/Monthly_*.xls"dir_path_inflation = '/Users/marta/Box Sync/ProjecteFinal/eurostats/Inflation/'inflation_file = 'inflation_tec00118.xlsx'gdp = GDP(dir_gdp, filegdp)pop = Population(dir_pop, filepop)un = Unemployment(dir_un, file_un)#a.select_countries_data(['ES'])# Monthly consumptionmpc = MonthlyPowerConsumptions(dir_path, patternM, skiprows=7, save=0)###### YEARLY CONSUMPTION#Yearly study# Central Western Europe (Austria, Belgium, Germany, France, the Netherlands, Switzerland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'DE', 'FR', 'NL', 'CH'], year=2000), 'GWh', 'Consumption for the Central Western Europe Electricity Market', kind='bar', color='rgmkby')visual.plot_several_countries(pop.select_countries_data(['AT', 'BE', 'DE', 'FR', 'NL', 'CH']), 'Inhabitants', 'Population', color='rgkbym')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DE', 'FR'], year=2000), 'GWh', 'Consumption for Germany and France', kind='line', color='kb')visual.plot_several_countries(gdp.select_countries_data(['DE', 'FR']), '%', 'GDP growth rate for Germany & France', color="kb")visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'NL', 'CH'], year=2000), 'GWh', 'Consumption for Austria, Belgium, The Netherlands and Switzerland', kind='bar', color='rgmy')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'DE', 'FR', 'NL', 'CH'], year=2000, normalized=True), 'Normalized', 'Normalized consumption for the Central Western Europe Electricity Market', kind='bar', color='rgmkby')visual.plot_several_countries(gdp.select_countries_data(['AT', 'BE', 'NL', 'CH']), '%', 'GDP growth rate for Austria, Belgium, The Netherlands and Switzerland', kind='bar', color='rgym')# British Isles (UK, Ireland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE']), 'GWh', 'Consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE'], normalized=True), 'Normalized', 'Normalized consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(gdp.select_countries_data(['UK', 'IE']), '%', 'GDP growth rate for Great Britain & Ireland', color="bg")# Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'GWh', 'Consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')#visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'FI', 'NO', 'SE']), 'GWh', 'Consumption for Denmark, Finland, Norway, Sweden', kind='bar', color='rmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE'], normalized=True), 'Normalized', 'Normalized consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')visual.plot_several_countries(pop.select_countries_data(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'Inhabitants', 'Population', color='rgmbkyc')visual.plot_several_countries(gdp.select_countries_data(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), '%', 'GDP growth rate for Northern Europe', color="rgmbkyc")# Apennine Peninsula (Italy)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT']), 'GWh', 'Consumption for the Apennine Peninsula (Italy) Electricity Market', kind='bar', color='g', legend=False)# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT']), 'GWh', 'Consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT'], normalized=True), 'Normalized', 'Normalized consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')# Central Eastern Europe (Czech Republic, Hungary, Poland, Romania, Slovakia, Slovenia)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI']), 'GWh', 'Consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI'], normalized=True), 'Normalized', 'Normalized '                                                                                                                                         'consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')# South Eastern Europe (Greece)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GR']), 'GWh', 'Consumption for South Eastern Europe Electricity Market: Greece', kind='bar', color='b', legend=False)#### Southern countriesvisual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT', 'ES', 'PT', 'GR']), 'GWh', 'Consumption for the Southern countries: Italy, Spain, Portugal and Greece', kind='bar', color='rbgk')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT', 'ES', 'PT', 'GR'], normalized=True), 'Normalized', 'Normalized consumption for the Southern countries: Italy, Spain, Portugal and Greece', kind='bar', color='rbgk')##### INFLATION# Read inflationinflation = Inflation(dir_path_inflation, inflation_file)#Southern countries# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(inflation.select_countries_data(['ES', 'PT']), '%', 'Inflation Portugal & Spain')visual.plot_several_countries(inflation.select_countries_data(['ES', 'PT', 'IT']), '%', 'Inflation for the southern countries: Italy, Portugal & Spain', color='rgb')# Central Western Europe (Austria, Belgium, Germany, France, the Netherlands, Switzerland)visual.plot_several_countries(inflation.select_countries_data(['AT', 'BE', 'DE', 'FR', 'NL', 'CH']), '%', 'Inflation for the Central Western Europe', color='rgmkby')visual.plot_several_countries(inflation.select_countries_data(['DE', 'FR']), '%', 'Inflation for France and Germany', color='kb')# British Isles (UK, Ireland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE']), 'GWh', 'Consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE'], normalized=True), 'Normalized', 'Normalized consumption for the British Isles Electricity Market', kind='bar', color='bg')# Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'GWh', 'Consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'FI', 'NO', 'SE']), 'GWh', 'Consumption for Denmark, Finland, Norway, Sweden', kind='bar', color='rmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE'], normalized=True), 'Normalized', 'Normalized consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')# Apennine Peninsula (Italy)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT']), 'GWh', 'Consumption for the Apennine Peninsula (Italy) Electricity Market', kind='bar', color='g', legend=False)# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT']), 'GWh', 'Consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT'], normalized=True), 'Normalized', 'Normalized consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')# Central Eastern Europe (Czech Republic, Hungary, Poland, Romania, Slovakia, Slovenia)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI']), 'GWh', 'Consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI'], normalized=True), 'Normalized', 'Normalized '                                                                                                                                         'consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_monthly_average_consumption(mpc, ['ES', 'PT'], 'Normalized', 'Monthly average consumptions', color='rg')visual.plot_several_countries(mpc.get_monthly_consumption_countries()), 'Gwh', 'Monthly average consumptions', color='rg'import gdpdir_gdp = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_GDP/"# GDP GDP per capita in PPS# Index (EU28 = 100)# [tec00114] - GDP per capita in PPS - Index (EU28 = 100)# Short Description: Data from 1st of December 2014.## For most recent GDP data, consult dataset nama_gdp_c.## Gross domestic product (GDP) is a measure for the economic activity. It is defined as the value of all goods and services produced less the value of any goods or services used in their creation. The volume index of GDP per capita in Purchasing Power Standards (PPS) is expressed in relation to the European Union (EU28) average set to equal 100. If the index of a country is higher than 100, this country's level of GDP per head is higher than the EU average and vice versa. Basic figures are expressed in PPS, i.e. a common currency that eliminates the differences in price levels between countries allowing meaningful volume comparisons of GDP between countries. Please note that the index, calculated from PPS figures and expressed with respect to EU28 = 100, is intended for cross-country comparisons rather than for temporal comparisons."filegdp = "tec00114"## [tec00115] - Real GDP growth rate - volume - Percentage change on previous year# Short Description: Gross domestic product (GDP) is a measure of the economic activity, defined as the value of all goods and services produced less the value of any goods or services used in their creation. The calculation of the annual growth rate of GDP volume is intended to allow comparisons of the dynamics of economic development both over time and between economies of different sizes. For measuring the growth rate of GDP in terms of volumes, the GDP at current prices are valued in the prices of the previous year and the thus computed volume changes are imposed on the level of a reference year; this is called a chain-linked series. Accordingly, price movements will not inflate the growth rate.filegdp = "tec00115"a = gdp.GDP(dir_gdp, filegdp)a.select_countries_data(['ES'])# Short Description: The inhabitants of a given area on 1 January of the year in question (or, in some cases, on 31 December of the previous year). The population is based on data from the most recent census adjusted by the components of population change produced since the last census, or based on population registers.filepop = "tps00001"dir_pop = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Population/"import populationa = population.Population(dir_pop, filepop)a.select_countries_data(['ES'])fileun = "tsdec450"dir_un = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Unemployment/"import unemploymenta = unemployment.Unemployment(dir_pop, filepop)a.select_countries_data(['ES'])
\ No newline at end of file
+from monthlypowerconsumptions import MonthlyPowerConsumptionsimport visualizations as visualfrom inflation import Inflationfrom gdp import GDPfrom population import Populationfrom eurostat import EurostatIndicatordir_gdp = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_GDP/"#filegdp = "tec00114"filegdp = "tec00115"filepop = "tps00001"dir_pop = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Population/"fileun = "tsdec450"dir_un = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Unemployment/"dir_path = "/Users/marta/Box Sync/ProjecteFinal/all-country-data"patternM = "/Monthly_*.xls"dir_path_inflation = '/Users/marta/Box Sync/ProjecteFinal/eurostats/Inflation/'inflation_file = 'inflation_tec00118.xlsx'gdp = GDP(dir_gdp, filegdp)pop = Population(dir_pop, filepop)un = EurostatIndicator(dir_un, fileun, indicator='unemployment')#a.select_countries_data(['ES'])# Monthly consumptionmpc = MonthlyPowerConsumptions(dir_path, patternM, skiprows=7, save=0)###### YEARLY CONSUMPTION#Yearly study# Central Western Europe (Austria, Belgium, Germany, France, the Netherlands, Switzerland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'DE', 'FR', 'NL', 'CH'], year=2000), 'GWh', 'Consumption for the Central Western Europe Electricity Market', kind='bar', color='rgmkby')visual.plot_several_countries(pop.select_countries_data(['AT', 'BE', 'DE', 'FR', 'NL', 'CH']), 'Inhabitants', 'Population', color='rgkbym')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DE', 'FR'], year=2000), 'GWh', 'Consumption for Germany and France', kind='line', color='kb')visual.plot_several_countries(gdp.select_countries_data(['DE', 'FR']), '%', 'GDP growth rate for Germany & France', color="kb")visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'NL', 'CH'], year=2000), 'GWh', 'Consumption for Austria, Belgium, The Netherlands and Switzerland', kind='bar', color='rgmy')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['AT', 'BE', 'DE', 'FR', 'NL', 'CH'], year=2000, normalized=True), 'Normalized', 'Normalized consumption for the Central Western Europe Electricity Market', kind='bar', color='rgmkby')visual.plot_several_countries(gdp.select_countries_data(['AT', 'BE', 'NL', 'CH']), '%', 'GDP growth rate for Austria, Belgium, The Netherlands and Switzerland', kind='bar', color='rgym')# British Isles (UK, Ireland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE']), 'GWh', 'Consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE'], normalized=True), 'Normalized', 'Normalized consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(gdp.select_countries_data(['UK', 'IE']), '%', 'GDP growth rate for Great Britain & Ireland', color="bg")# Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'GWh', 'Consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')#visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'FI', 'NO', 'SE']), 'GWh', 'Consumption for Denmark, Finland, Norway, Sweden', kind='bar', color='rmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE'], normalized=True), 'Normalized', 'Normalized consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')visual.plot_several_countries(pop.select_countries_data(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'Inhabitants', 'Population', color='rgmbkyc')visual.plot_several_countries(gdp.select_countries_data(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), '%', 'GDP growth rate for Northern Europe', color="rgmbkyc")# Apennine Peninsula (Italy)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT']), 'GWh', 'Consumption for the Apennine Peninsula (Italy) Electricity Market', kind='bar', color='g', legend=False)# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT']), 'GWh', 'Consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT'], normalized=True), 'Normalized', 'Normalized consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')# Central Eastern Europe (Czech Republic, Hungary, Poland, Romania, Slovakia, Slovenia)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI']), 'GWh', 'Consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI'], normalized=True), 'Normalized', 'Normalized '                                                                                                                                         'consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')# South Eastern Europe (Greece)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GR']), 'GWh', 'Consumption for South Eastern Europe Electricity Market: Greece', kind='bar', color='b', legend=False)#### Southern countriesvisual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT', 'ES', 'PT', 'GR']), 'GWh', 'Consumption for the Southern countries: Italy, Spain, Portugal and Greece', kind='bar', color='rbgk')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT', 'ES', 'PT', 'GR'], normalized=True), 'Normalized', 'Normalized consumption for the Southern countries: Italy, Spain, Portugal and Greece', kind='bar', color='rbgk')##### INFLATION# Read inflationinflation = Inflation(dir_path_inflation, inflation_file)#Southern countries# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(inflation.select_countries_data(['ES', 'PT']), '%', 'Inflation Portugal & Spain')visual.plot_several_countries(inflation.select_countries_data(['ES', 'PT', 'IT']), '%', 'Inflation for the southern countries: Italy, Portugal & Spain', color='rgb')# Central Western Europe (Austria, Belgium, Germany, France, the Netherlands, Switzerland)visual.plot_several_countries(inflation.select_countries_data(['AT', 'BE', 'DE', 'FR', 'NL', 'CH']), '%', 'Inflation for the Central Western Europe', color='rgmkby')visual.plot_several_countries(inflation.select_countries_data(['DE', 'FR']), '%', 'Inflation for France and Germany', color='kb')# British Isles (UK, Ireland)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE']), 'GWh', 'Consumption for the British Isles Electricity Market', kind='bar', color='bg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['GB', 'IE'], normalized=True), 'Normalized', 'Normalized consumption for the British Isles Electricity Market', kind='bar', color='bg')# Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE']), 'GWh', 'Consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'FI', 'NO', 'SE']), 'GWh', 'Consumption for Denmark, Finland, Norway, Sweden', kind='bar', color='rmkbyc')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['DK', 'EE', 'FI','LV', 'LT', 'NO', 'SE'], normalized=True), 'Normalized', 'Normalized consumption for the Northern Europe (Denmark, Estonia, Finland, Latvia, Lithuania, Norway, Sweden) Electricity Market', kind='bar', color='rgmkbyc')# Apennine Peninsula (Italy)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['IT']), 'GWh', 'Consumption for the Apennine Peninsula (Italy) Electricity Market', kind='bar', color='g', legend=False)# Iberian Peninsula (Spain and Portugal)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT']), 'GWh', 'Consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['ES', 'PT'], normalized=True), 'Normalized', 'Normalized consumption for the Iberian Peninsula (Spain and Portugual) Electricity Market', kind='bar', color='rg')# Central Eastern Europe (Czech Republic, Hungary, Poland, Romania, Slovakia, Slovenia)visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI']), 'GWh', 'Consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_several_countries(mpc.get_yearly_consumption_countries(['CZ', 'HU', 'PL', 'RO', 'SK', 'SI'], normalized=True), 'Normalized', 'Normalized '                                                                                                                                         'consumption for Central Eastern Europe Electricity Market', kind='bar', color='grbykm')visual.plot_monthly_average_consumption(mpc, ['ES', 'PT'], 'Normalized', 'Monthly average consumptions', color='rg')visual.plot_several_countries(mpc.get_monthly_consumption_countries()), 'Gwh', 'Monthly average consumptions', color='rg'import gdpdir_gdp = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_GDP/"# GDP GDP per capita in PPS# Index (EU28 = 100)# [tec00114] - GDP per capita in PPS - Index (EU28 = 100)# Short Description: Data from 1st of December 2014.## For most recent GDP data, consult dataset nama_gdp_c.## Gross domestic product (GDP) is a measure for the economic activity. It is defined as the value of all goods and services produced less the value of any goods or services used in their creation. The volume index of GDP per capita in Purchasing Power Standards (PPS) is expressed in relation to the European Union (EU28) average set to equal 100. If the index of a country is higher than 100, this country's level of GDP per head is higher than the EU average and vice versa. Basic figures are expressed in PPS, i.e. a common currency that eliminates the differences in price levels between countries allowing meaningful volume comparisons of GDP between countries. Please note that the index, calculated from PPS figures and expressed with respect to EU28 = 100, is intended for cross-country comparisons rather than for temporal comparisons."filegdp = "tec00114"## [tec00115] - Real GDP growth rate - volume - Percentage change on previous year# Short Description: Gross domestic product (GDP) is a measure of the economic activity, defined as the value of all goods and services produced less the value of any goods or services used in their creation. The calculation of the annual growth rate of GDP volume is intended to allow comparisons of the dynamics of economic development both over time and between economies of different sizes. For measuring the growth rate of GDP in terms of volumes, the GDP at current prices are valued in the prices of the previous year and the thus computed volume changes are imposed on the level of a reference year; this is called a chain-linked series. Accordingly, price movements will not inflate the growth rate.filegdp = "tec00115"a = gdp.GDP(dir_gdp, filegdp)a.select_countries_data(['ES'])# Short Description: The inhabitants of a given area on 1 January of the year in question (or, in some cases, on 31 December of the previous year). The population is based on data from the most recent census adjusted by the components of population change produced since the last census, or based on population registers.filepop = "tps00001"dir_pop = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Population/"import populationa = population.Population(dir_pop, filepop)a.select_countries_data(['ES'])fileun = "tsdec450"dir_un = "/Users/marta/Box Sync/ProjecteFinal/eurostats/_Unemployment/"import eurostata = eurostat.EurostatIndicator(dir_un, fileun, indicator='unemployment')a.select_countries_data(['ES'])
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+This module provides functions to parse indicators from eurostats (GDP,
+population, inflation, unemployment,...) to a Pandas DataFrame. The TSV and
+the XLSX files have one row per country and one column per year, the values
+can have flags after them. Ex: "1.4 e" (estimated), ": " (not available)
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# import packages for analysis and modeling
+# data frame operations
+import pandas as pd
+# cache of the parsed data frames
+import cache
+
+# indicators that can be loaded. A new indicator only needs a new entry:
+# format: 'tsv' or 'xlsx'
+# cache: name of the saved data frame
+INDICATORS = {
+    'gdp': {'format': 'tsv', 'cache': 'gdp'},
+    'population': {'format': 'tsv', 'cache': 'population'},
+    'unemployment': {'format': 'tsv', 'cache': 'unemployment'},
+    'inflation': {'format': 'xlsx', 'cache': 'inflation'},
+}
+
+# version of the data frames built by parse_indicator, it is part of the
+# cache keys so the saved data frames are parsed again when it changes
+FORMAT_VERSION = 2
+
+# flags of the eurostats values
+FLAGS = {'b': 'break in time series', 'c': 'confidential',
+         'd': 'definition differs', 'e': 'estimated', 'f': 'forecast',
+         'n': 'not significant', 'p': 'provisional', 'r': 'revised',
+         's': 'Eurostat estimate', 'u': 'low reliability',
+         'z': 'not applicable'}
+
+# value and flags of a cell. Ex: "1.4 e", ": c", "12345"
+VALUE_PATTERN = r'^\s*([^\s]*)\s*([a-z]*)\s*$'
+
+
+def _year(column):
+    """
+    Year of a column name, as an integer when it is only a year. Ex: '2004 '
+    """
+    column = str(column).strip()
+    if column.isdigit():
+        return int(column)
+    return column
+
+
+def parse_indicator(file_name, file_format='tsv'):
+    """
+    This function parses an indicator file from eurostats with vectorized
+    operations on all its cells at once
+    @param file_name: The TSV or XLSX file to be read
+    @param file_format: 'tsv' or 'xlsx'
+    @return: tuple with (data frame year x country with the float values,
+    data frame year x country with the flags of the values as categories,
+    '' for the values without flags)
+    """
+    if file_format == 'tsv':
+        wb = pd.read_csv(file_name, sep='\t', dtype=str)
+    elif file_format == 'xlsx':
+        wb = pd.read_excel(file_name, dtype=str)
+    else:
+        raise ValueError("Unknown indicator format: " + str(file_format))
+
+    # the first column has the dimensions of the row separated by commas,
+    # the country is the one named geo on the header. Ex: 'unit,geo\time'
+    dimensions = wb.columns[0].split(',')
+    geo = [position for position, dimension in enumerate(dimensions)
+           if dimension.startswith('geo')]
+    geo = geo[0] if geo else len(dimensions) - 1
+    countries = wb.iloc[:, 0].str.split(',', expand=True)[geo].str.strip()
+
+    # split the value and the flags of all the cells at once
+    cells = wb.iloc[:, 1:]
+    parts = pd.Series(cells.values.ravel()).astype(str).str.extract(
+        VALUE_PATTERN, expand=True)
+    values = pd.to_numeric(parts[0], errors='coerce').to_numpy('float64')
+    flags = parts[1].fillna('').to_numpy(object)
+
+    # year x country, as the indicator classes use them
+    years = pd.Index([_year(column) for column in cells.columns],
+                     name='year')
+    df = pd.DataFrame(values.reshape(cells.shape).T, index=years,
+                      columns=countries.values, dtype='float64')
+    flags = pd.DataFrame(flags.reshape(cells.shape).T, index=years,
+                         columns=countries.values)
+    flags = flags.astype(pd.CategoricalDtype(sorted(set(flags.values.ravel())
+                                                    | set(['']))))
+    df.columns.name = ''
+    flags.columns.name = ''
+
+    return df, flags
+
+
+class EurostatIndicator(object):
+    """
+        This class contains all the structures and functions to handle
+        an indicator from eurostats for several countries
+    """
+    DEFAULT_ENCODING = 'UTF-8'
+
+    # name of the indicator on INDICATORS
+    indicator = None
+
+    # constructor
+    def __init__(self, dir_path, filename, save=0, indicator=None):
+        """
+        Constructor
+        @param dir_path: The path where to search for the files
+        @param filename: The file to be read
+        @param save: Save a pickle of the dataframe to not read the file again
+        @param indicator: name of the indicator on INDICATORS, the one of the
+        class if not given. Ex: 'unemployment'
+        @return: A Pandas DataFrame object with the indicator data
+        """
+        if indicator is not None:
+            self.indicator = indicator
+        if self.indicator not in INDICATORS:
+            raise ValueError("Unknown indicator: " + str(self.indicator))
+
+        # check if there is a saved data frame from the same file
+        config = INDICATORS[self.indicator]
+        key = cache.cache_key([dir_path + filename], version=FORMAT_VERSION)
+        saved = cache.load(dir_path, config['cache'], key)
+        if saved is None:
+            self.load_dataframe(dir_path, filename, save=save)
+        else:
+            self.df = saved['df']
+            self.flags = saved['flags']
+
+    # load data frame from file
+    def load_dataframe(self, dir_path, filename, save=0):
+        """
+        This function parses the indicator data from all countries and
+        returns a Pandas DataFrame with the following schema:
+        (year, country1, country2,....)
+        The flags of the values (Ex: 'e' estimated, 'p' provisional) are on
+        self.flags with the same schema
+        @param dir_path: The path where to search for the files
+        @param filename: The file to be read
+        @param save: Save a pickle of the dataframe to not read the file again
+        @return: A Pandas DataFrame object with the indicator data
+        for all countries and years available
+        """
+        config = INDICATORS[self.indicator]
+        self.df, self.flags = parse_indicator(dir_path + filename,
+                                              config['format'])
+
+        # save the data frame for latter use, to avoid reading the file again
+        if save == 1:
+            key = cache.cache_key([dir_path + filename],
+                                  version=FORMAT_VERSION)
+            cache.save(dir_path, config['cache'], key,
+                       {'df': self.df, 'flags': self.flags})
+
+        # return dataframe
+        return self.df
+
+    def select_country_data(self, country):
+        """
+        This function selects the data from a country
+        @param country: Country to select
+        @return: data frame indexed by year with a column named as the
+        indicator
+        """
+        return self.df[[country]].rename(columns={country: self.indicator})
+
+    def select_countries_data(self, country_list):
+        """
+        This function selects the data from several countries
+        @param country_list: A list of countries for example ['ES','PT']
+        @return: data frame with the countries data
+        """
+        return self.df[list(country_list)]
+
+    def select_flagged_data(self, country_list, flags='ep'):
+        """
+        This function selects the values from several countries that have
+        some flags, the other values are NaN
+        @param country_list: A list of countries for example ['ES','PT']
+        @param flags: flags to select, see FLAGS. Ex: 'ep' for the estimated
+        and the provisional values
+        @return: data frame with the flagged values of the countries
+        """
+        country_list = list(country_list)
+
+        # the flags are checked once per category, not per value
+        categories = pd.Index(self.flags.dtypes.iloc[0].categories
+                              if len(self.flags.columns) else [])
+        selected = categories[categories.str.contains('[' + flags + ']')]
+
+        return self.df[country_list].where(
+            self.flags[country_list].isin(list(selected)))
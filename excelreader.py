@@ -0,0 +1,90 @@
+"""
+This module provides the functions to read the worksheets of the
+https://www.entsoe.eu/ files. Each worksheet is parsed only once, with the
+fastest Excel engine available, and the header rows (Ex: "Year:") and the
+data block are taken from the same read
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+
+
+def default_engine():
+    """
+    This function chooses the engine used by pandas to read the Excel files.
+    The calamine engine (python-calamine package) is much faster than
+    openpyxl, it is used when it is installed
+    @return: 'calamine' or None to let pandas choose
+    """
+    try:
+        import python_calamine
+        return 'calamine'
+    except ImportError:
+        return None
+
+
+# engine used when none is given
+ENGINE = default_engine()
+
+
+def _column_name(value, position):
+    """
+    Name of a column from its header cell, numbers read as floats (Ex: the
+    month 1.0) are named as integers and empty cells as pandas does
+    """
+    if isinstance(value, float):
+        if value != value:
+            return 'Unnamed: %d' % position
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def read_sheet(file_name, sheet='Statistics', skiprows=0, maxcolumns=None,
+               na_values=(u'n.a.',), engine=None):
+    """
+    This function reads a worksheet once and splits it in the header rows and
+    the data block, that has its column names on the row after skiprows
+    @param file_name: The excel file to be read
+    @param sheet: The sheet to be read
+    @param skiprows: rows before the data block
+    @param maxcolumns: number of columns to parse or None to parse all of
+    them. Ex: 27 for the hourly files (Country, Day, 24 hours and the change
+    of hour)
+    @param na_values: values of the data block that are missing values
+    @param engine: engine used by pandas.read_excel or None to use ENGINE
+    @return: tuple with (data frame with the header rows, data frame with
+    the data block)
+    """
+    usecols = None
+    if maxcolumns is not None:
+        usecols = lambda column: column < maxcolumns
+
+    raw = pd.read_excel(file_name, sheet, header=None, usecols=usecols,
+                        na_values=list(na_values), keep_default_na=False,
+                        engine=engine or ENGINE)
+
+    header = raw.iloc[:skiprows]
+
+    data = raw.iloc[skiprows + 1:].reset_index(drop=True)
+    data.columns = [_column_name(value, position) for position, value
+                    in enumerate(raw.iloc[skiprows].values)]
+
+    return header, data.infer_objects()
+
+
+def header_value(header, label):
+    """
+    This function finds a value of the header rows from the label on its
+    left. Ex: the year of the file from "Year:"
+    @param header: data frame with the header rows, see read_sheet
+    @param label: text of the cell on the left of the value
+    @return: the value or None if the label is not found
+    """
+    for row in range(len(header)):
+        if header.iloc[row, 0] == label and len(header.columns) > 1:
+            return header.iloc[row, 1]
+    return None
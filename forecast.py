@@ -0,0 +1,250 @@
+"""
+This module provides hourly demand forecasts for all the countries at once,
+built as shape x monthly level x trend:
+- the shape of the day of each weekday, from the hourly prototypes (see
+  HourlyPowerConsumptions.get_hourly_prototype_weekday_countries) and the
+  level of each weekday compared to the others
+- the share of the yearly consumption of each month, from the monthly data
+- the yearly consumption, from a log-linear trend of the yearly totals
+The fits and the forecasts are array operations over all the countries, the
+hours are local hours, 24 per day (the changes of time are not modelled)
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# countries that can not be fitted
+import warnings
+# columns with the hourly consumptions
+from hourlypowerconsumptions import HOURS
+# least squares fits of all the countries at once
+from regression import batch_fit
+
+# iterations of the fit of the monthly shares when some months are missing
+SHARES_ITERATIONS = 20
+
+
+def weekday_shapes(df, countries):
+    """
+    This function gets the daily shapes and the weekday levels from the
+    average consumption per weekday and hour
+    @param df: data frame (Country, weekday, H01,...,H24, daily), see
+    HourlyPowerConsumptions.get_daily_aggregates_countries
+    @param countries: list of countries, the order of the results
+    @return: tuple with the shapes (country x weekday x hour array, each day
+    with mean 1 as the prototypes) and the levels (country x weekday array,
+    the daily consumption of each weekday over the mean of the weekdays). A
+    weekday without data gets the mean shape of the other ones and level 1
+    """
+    shapes = np.full((len(countries), 7, 24), np.nan)
+    daily = np.full((len(countries), 7), np.nan)
+
+    position = dict((country, pos) for pos, country in enumerate(countries))
+    rows = df['Country'].astype(str).map(position)
+    df = df[rows.notnull().values]
+    rows = rows.dropna().astype(int).values
+    weekdays = df['weekday'].astype(int).values
+
+    hours = df[HOURS].to_numpy('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shapes[rows, weekdays] = hours / np.nanmean(hours, axis=1)[:, np.newaxis]
+        daily[rows, weekdays] = df['daily'].to_numpy('float64')
+
+        # the weekdays without data
+        mean_shapes = np.nanmean(shapes, axis=1)
+        shapes = np.where(np.isnan(shapes), mean_shapes[:, np.newaxis, :],
+                          shapes)
+        levels = daily / np.nanmean(daily, axis=1)[:, np.newaxis]
+    levels[np.isnan(levels)] = 1.0
+
+    return shapes, levels
+
+
+def monthly_shares(df, countries):
+    """
+    This function gets the share of the yearly consumption of each month,
+    the months missing on some years are left out of the fit of those years
+    so they use the other years. A country with a month without data on all
+    the years gets NaN shares and totals and a warning
+    @param df: monthly consumptions in long format, see
+    MonthlyPowerConsumptions.get_monthly_series
+    @param countries: list of countries, the order of the results
+    @return: tuple with the shares (country x month array, each country adds
+    up to 1) and the yearly totals (data frame indexed by year with a column
+    per country, the years with missing months are completed with the
+    shares of the months they have)
+    """
+    df = df[df['country'].astype(str).isin(countries)]
+    values = df.pivot_table(index=[df['country'].astype(str).values,
+                                   df['year'].values],
+                            columns=df['month'].values, values='value',
+                            aggfunc='last', dropna=False)
+    values = values.reindex(columns=range(1, 13))
+    values = values[values.notnull().any(axis=1)]
+
+    # value = yearly total x share of the month, fitted alternating the
+    # totals (from the months each year has) and the shares (from the years
+    # that have each month)
+    countries_index = values.index.get_level_values(0)
+    present = values.notnull().values
+    shares = values.div(values.mean(axis=1), axis=0).groupby(
+        level=0).mean().reindex(countries)
+
+    # the countries with a month without data are not fitted
+    unfitted = shares.isnull().any(axis=1)
+    if unfitted.any():
+        warnings.warn("No monthly data on any year for the months of: " +
+                      ', '.join('%s (%s)' % (country, ', '.join(
+                          str(month) for month in
+                          shares.columns[shares.loc[country].isnull()]))
+                          for country in shares.index[unfitted]))
+        shares.loc[unfitted.values] = np.nan
+
+    for iteration in range(SHARES_ITERATIONS):
+        shares = shares.div(shares.sum(axis=1), axis=0)
+        totals = values.sum(axis=1) / (
+            present * shares.loc[countries_index].values).sum(axis=1)
+        shares = values.div(totals, axis=0).groupby(level=0).mean().reindex(
+            countries)
+    shares = shares.div(shares.sum(axis=1), axis=0)
+    totals = values.sum(axis=1) / (
+        present * shares.loc[countries_index].values).sum(axis=1)
+
+    totals = totals.unstack(level=0).reindex(columns=countries)
+    totals.index.name = 'year'
+    return shares.to_numpy('float64'), totals
+
+
+def trend_fit(totals):
+    """
+    This function fits log(total) = intercept + slope * year for all the
+    countries at once, see regression.batch_fit
+    @param totals: data frame indexed by year with a column per country
+    @return: data frame indexed by country with the fit and a 'last' column
+    with the last yearly total, used by the countries with less than two
+    years
+    """
+    years = pd.DataFrame(np.repeat(np.asarray(totals.index, dtype='float64'),
+                                   totals.shape[1]).reshape(totals.shape),
+                         index=totals.index, columns=totals.columns)
+    fit = batch_fit(np.log(totals.where(totals > 0)), years)
+    fit['last'] = totals.ffill().iloc[-1] if len(totals) else np.nan
+    return fit
+
+
+class DemandForecast(object):
+    """
+        This class contains the shapes, monthly shares and trends of several
+        countries and forecasts their hourly consumption. The countries
+        with a month without monthly data are on self.unfitted and their
+        forecasts are NaN
+    """
+
+    # constructor
+    def __init__(self, hpc, mpc, country_list, year="", num_years="",
+                 scale=0.001, trend=True):
+        """
+        Constructor
+        @param hpc: HourlyPowerConsumptions object
+        @param mpc: MonthlyPowerConsumptions object
+        @param country_list: list of countries to fit. Ex: ['ES', 'PT']
+        @param year: reference year of the hourly shapes or "" to use all
+        available years
+        @param num_years: Number of previous years for the hourly shapes or
+        "" to use all available years
+        @param scale: factor from the hourly to the monthly units. Ex: 0.001
+        from MWh to GWh
+        @param trend: True to extrapolate the yearly totals with the trend,
+        False to use the last yearly total
+        @return: DemandForecast object
+        """
+        self.countries = list(country_list)
+        self.scale = scale
+        self.trend = trend
+
+        self.shapes, self.levels = weekday_shapes(
+            hpc.get_daily_aggregates_countries(self.countries, year=year,
+                                               num_years=num_years),
+            self.countries)
+        self.shares, self.totals = monthly_shares(
+            mpc.get_monthly_series(self.countries), self.countries)
+        self.fit = trend_fit(self.totals)
+
+        # countries without monthly shares, their forecasts are NaN
+        self.unfitted = [country for country, missing in zip(
+            self.countries, np.isnan(self.shares).any(axis=1)) if missing]
+
+    def yearly_totals(self, years):
+        """
+        This function gets the forecasted yearly consumption
+        @param years: list of years. Ex: [2015, 2016]
+        @return: data frame indexed by year with a column per country, in
+        the monthly units
+        """
+        last = self.fit['last'].to_numpy('float64')
+        if not self.trend:
+            values = np.tile(last, (len(years), 1))
+        else:
+            slope = self.fit['slope'].to_numpy('float64')
+            intercept = self.fit['intercept'].to_numpy('float64')
+            values = np.exp(intercept[np.newaxis, :] +
+                            slope[np.newaxis, :] *
+                            np.asarray(years, dtype='float64')[:, np.newaxis])
+            values = np.where(np.isnan(values), last[np.newaxis, :], values)
+
+        df = pd.DataFrame(values, index=pd.Index(years, name='year'),
+                          columns=self.fit.index)
+        return df.reindex(columns=self.countries)
+
+    def forecast(self, year, country_list=None):
+        """
+        This function forecasts the hourly consumption of a year. The
+        monthly consumption (yearly total x monthly share) is split between
+        the days of the month by the weekday levels and each day by the
+        shape of its weekday, so the hours of a month add up to the monthly
+        consumption
+        @param year: year to forecast. Ex: 2016
+        @param country_list: list of countries or None for all the fitted
+        ones
+        @return: data frame (Country, date, weekday, month, year, H01,...,H24,
+        daily) as the hourly data frame, in the hourly units
+        """
+        if country_list is None:
+            country_list = self.countries
+        rows = np.array([self.countries.index(country)
+                         for country in country_list], dtype=int)
+
+        dates = pd.date_range(pd.Timestamp(year, 1, 1),
+                              pd.Timestamp(year, 12, 31), freq='D')
+        weekday = dates.weekday.values
+        month = dates.month.values - 1
+
+        # weight of each day of a month from the level of its weekday
+        weights = self.levels[rows][:, weekday]
+        months = (month[:, np.newaxis] ==
+                  np.arange(12)[np.newaxis, :]).astype('float64')
+        month_weights = weights.dot(months)
+
+        totals = self.yearly_totals([year]).to_numpy('float64')[0][rows]
+        monthly = totals[:, np.newaxis] * self.shares[rows]
+        daily = (monthly[:, month] * weights / month_weights[:, month] /
+                 self.scale)
+        hourly = (daily[:, :, np.newaxis] *
+                  self.shapes[rows][:, weekday, :] / 24)
+
+        num_days = len(dates)
+        df = pd.DataFrame(hourly.reshape(len(rows) * num_days, 24),
+                          columns=HOURS)
+        df.insert(0, 'Country', np.repeat(np.asarray(country_list,
+                                                     dtype=object), num_days))
+        df['date'] = np.tile(dates.values, len(rows))
+        df['weekday'] = np.tile(weekday, len(rows))
+        df['month'] = np.tile(month + 1, len(rows))
+        df['year'] = year
+        df['daily'] = daily.ravel()
+
+        return df
@@ -0,0 +1,225 @@
+"""
+This module provides a NumPy engine for the hourly consumption queries. The
+data is kept as a dense (country, day, hour) array so the daily, weekday and
+prototype aggregations are single reductions over its axes
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# timing of the benchmark
+import time
+# columns with the hourly consumptions
+from hourlypowerconsumptions import HOURS
+
+# data types of the daily aggregates, the ones of the hourly data frame
+DAILY_DTYPES = {'weekday': 'int8', 'month': 'int8', 'year': 'int16',
+                'daily': 'float64'}
+
+
+class HourlyCube(object):
+    """
+        This class contains the hourly consumptions as a
+        (country, day, 24) array with NaN on the missing days
+    """
+
+    # constructor
+    def __init__(self, df, dtype='float64'):
+        """
+        Constructor, a ValueError is raised if a country has several rows of
+        the same day
+        @param df: hourly data frame (Country, H01,...,H24, date,...) as built
+        by HourlyPowerConsumptions
+        @param dtype: data type of the array
+        """
+        dates = pd.to_datetime(df['date']).values.astype('datetime64[D]')
+        # the dates of the results have the unit of the data frame ones
+        self.date_dtype = pd.to_datetime(df['date']).dtype
+        countries = pd.Categorical(df['Country'].astype(str))
+
+        self.countries = list(countries.categories)
+        self.start = dates.min()
+        self.dates = pd.date_range(self.start, dates.max(), freq='D')
+        self.weekday = np.asarray(self.dates.weekday)
+        self.month = np.asarray(self.dates.month)
+        self.year = np.asarray(self.dates.year)
+
+        # position of each row on the array
+        country_idx = countries.codes
+        day_idx = (dates - self.start).astype(int)
+
+        # a day of a country has one place on the array, the pandas engine
+        # would count the duplicated rows twice
+        keys = country_idx.astype('int64') * len(self.dates) + day_idx
+        keys, counts = np.unique(keys, return_counts=True)
+        if (counts > 1).any():
+            key = keys[counts > 1][0]
+            raise ValueError("Duplicated day on the hourly data: %s %s (%d "
+                             "duplicated days)" % (
+                                 self.countries[key // len(self.dates)],
+                                 self.dates[key % len(self.dates)].date(),
+                                 (counts > 1).sum()))
+
+        self.values = np.full((len(self.countries), len(self.dates), 24),
+                              np.nan, dtype=dtype)
+        self.values[country_idx, day_idx, :] = df[HOURS].values
+
+        # days with data
+        self.mask = np.zeros((len(self.countries), len(self.dates)),
+                             dtype=bool)
+        self.mask[country_idx, day_idx] = True
+
+    def _days(self, country_list, years):
+        """
+        Select the countries and the valid days to aggregate
+        @return: tuple with (countries, country positions, valid days mask)
+        """
+        countries = [country for country in self.countries
+                     if country in country_list]
+        idx = np.array([self.countries.index(country)
+                        for country in countries], dtype=int)
+
+        valid = self.mask[idx]
+        if years is not None:
+            valid = valid & np.isin(self.year, list(years))[np.newaxis, :]
+
+        return countries, idx, valid
+
+    def daily_totals(self):
+        """
+        This function sums the hourly consumptions of each day
+        @return: (country, day) array with NaN on the missing days
+        """
+        daily = np.nansum(self.values, axis=2)
+        daily[~self.mask] = np.nan
+        return daily
+
+    def historical_daily_aggregates(self, country, years=None):
+        """
+        Daily aggregate consumption of a country, see
+        HourlyPowerConsumptions.historical_daily_aggregates
+        @param country: country to select. Ex: "ES" for Spain
+        @param years: list of years to select or None for all of them
+        @return data frame with the daily aggregated consumption, sorted
+        by date
+        """
+        if country not in self.countries:
+            df = pd.DataFrame(columns=['date', 'weekday', 'month', 'year',
+                                       'daily'])
+            return df.astype(self._daily_dtypes())
+
+        idx = self.countries.index(country)
+        days = self.mask[idx]
+        if years is not None:
+            days = days & np.isin(self.year, list(years))
+
+        df = pd.DataFrame({'date': self.dates[days],
+                           'weekday': self.weekday[days],
+                           'month': self.month[days],
+                           'year': self.year[days],
+                           'daily': np.nansum(self.values[idx, days],
+                                              axis=1)},
+                          columns=['date', 'weekday', 'month', 'year',
+                                   'daily'])
+        return df.astype(self._daily_dtypes())
+
+    def _daily_dtypes(self):
+        """
+        Data types of the daily aggregates, see historical_daily_aggregates
+        """
+        dtypes = dict(DAILY_DTYPES)
+        dtypes['date'] = self.date_dtype
+        return dtypes
+
+    def daily_aggregates(self, country_list, years=None):
+        """
+        Average consumption per country, weekday and hour, see
+        HourlyPowerConsumptions.get_daily_aggregates_countries
+        @param country_list: list of countries to select
+        @param years: list of years to select or None for all of them
+        @return: data frame (Country, weekday, H01,...,H24, daily)
+        """
+        countries, idx, valid = self._days(country_list, years)
+
+        values = self.values[idx]
+        present = ~np.isnan(values) & valid[:, :, np.newaxis]
+
+        # one column per weekday to reduce the days axis by weekday
+        weekdays = (self.weekday[:, np.newaxis] ==
+                    np.arange(7)[np.newaxis, :]).astype(values.dtype)
+
+        sums = np.einsum('cdh,dw->cwh', np.where(present, values, 0),
+                         weekdays)
+        counts = np.einsum('cdh,dw->cwh', present.astype(values.dtype),
+                           weekdays)
+        daily_sums = np.einsum('cd,dw->cw', np.where(present, values,
+                                                     0).sum(axis=2), weekdays)
+        days = np.einsum('cd,dw->cw', valid.astype(values.dtype), weekdays)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+            daily = daily_sums / days
+
+        # only the (country, weekday) pairs with data, as a groupby gives
+        rows = days > 0
+        country_pos, weekday = np.nonzero(rows)
+
+        df = pd.DataFrame(means[rows], columns=HOURS)
+        df.insert(0, 'weekday', weekday)
+        df.insert(0, 'Country', [countries[pos] for pos in country_pos])
+        df['daily'] = daily[rows]
+
+        return df
+
+
+def benchmark_engines(hpc, country_list, year="", num_years="", repeat=5):
+    """
+    This function compares the time of the pandas and the numpy engines of an
+    HourlyPowerConsumptions object on the same queries, the memoized daily
+    aggregates are removed before each call
+    @param hpc: HourlyPowerConsumptions object with the data in memory
+    @param country_list: list of countries to use on the queries
+    @param year: reference year of the queries or "" for all of them
+    @param num_years: number of previous years or "" for all of them
+    @param repeat: number of times each query is repeated
+    @return: dictionary engine -> query -> best time in seconds
+    """
+    engine = hpc.engine
+    queries = {
+        'get_daily_aggregates_countries':
+            lambda: hpc.get_daily_aggregates_countries(country_list, year,
+                                                       num_years),
+        'get_hourly_prototype_countries':
+            lambda: hpc.get_hourly_prototype_countries(country_list, year,
+                                                       num_years),
+        'historical_daily_aggregates':
+            lambda: hpc.historical_daily_aggregates(country_list[0],
+                                                    year or 2100,
+                                                    num_years or 200)}
+
+    results = {}
+    try:
+        for name in ['pandas', 'numpy']:
+            hpc.set_engine(name)
+            # the array of the numpy engine is not timed
+            if name == 'numpy':
+                hpc.get_cube()
+
+            results[name] = {}
+            for query, function in queries.items():
+                times = []
+                for i in range(repeat):
+                    # the memoized aggregates are not timed either
+                    hpc.clear_aggregates_cache()
+                    start = time.time()
+                    function()
+                    times.append(time.time() - start)
+                results[name][query] = min(times)
+    finally:
+        hpc.set_engine(engine)
+
+    return results
@@ -14,8 +14,344 @@ import glob
 # dates treatment
 import datetime
 import os
+# parallel parsing of the files
+import multiprocessing
 # regular expressions
 import re
+# memoized aggregates and files parsed ahead
+from collections import OrderedDict, deque
+# array operations
+import numpy as np
+# cache of the parsed data frames
+import cache
+# calls instrumentation
+import instrumentation
+# weekday, month, year,... from the dates
+import datefeatures
+# worksheets reader
+import excelreader
+# checks of the parsed files
+import validation
+# computations split by country
+import parallel
+
+# columns with the hourly consumptions
+HOURS = ['H%02d' % hour for hour in range(1, 25)]
+
+# column with the second 2:00 to 3:00 hour of the day the clock goes back
+# in October (3B:00:00 on the files), NaN on the other days
+DST_HOUR = 'H03B'
+
+# version of the data frames built by read_hourly_file, it is part of the
+# cache keys so the saved data frames are parsed again when it changes
+FORMAT_VERSION = 5
+
+
+def parse_hourly_file(file_name, sheet='Statistics', skiprows=9,
+                      maxcolumns=26, hourchange='3B:00:00'):
+    """
+    This function parses one hourly consumption file, checks it (see
+    validation.validate_hourly) and normalizes it to the schema used by
+    HourlyPowerConsumptions:
+    (Country, H01, H02,...,H24, H03B, date, weekday, month, year, daily,
+    outlier, dst_filled, gap)
+    @param file_name: The excel file to be read
+    @param sheet: The sheet to be read
+    @param skiprows: rows to skip from the excel file
+    @param maxcolumns: max number of columns that should appear on the
+    excel file (except for months with hour change)
+    @param hourchange: label showing the hour change that makes a new
+    column on the worksheet and should be treated
+    @return: tuple with (A Pandas DataFrame object with the hourly
+    consumption of the file, data frame with the quarantined rows,
+    dictionary with the validation report of the file)
+    """
+
+    print(file_name)
+
+    # read excel file, only the hourly columns and the change of hour
+    wb = excelreader.read_sheet(file_name, sheet, skiprows,
+                                maxcolumns=maxcolumns + 1)[1]
+
+    # check if there are more than maxcolumns since
+    # it means a change of hour
+    if len(wb.columns) != maxcolumns:
+        # keep the change of hour out of the daily hours
+        wb = wb.rename(columns={hourchange: DST_HOUR})
+        # change columns name for 3A:00 to 3:00
+        wb = wb.rename(columns=lambda x:
+        re.sub(r'^(\d{1})A:.+', 'H0\\1', x))
+    else:
+        wb[DST_HOUR] = np.nan
+
+    # change columns names if they are hours for H01, H02,...
+    wb = wb.rename(columns=lambda x: re.sub(r'^(\d{2}):.+', 'H\\1', x))
+
+    # remove rows if they have too many NaN (at least the 23 non NaN)
+    wb = wb.dropna(thresh=23)
+
+    # hourly consumptions as numbers, rows with values that are not numbers
+    # or negative are quarantined
+    wb, quarantine, report = validation.validate_hourly(
+        wb, HOURS, file_name, dst_column=DST_HOUR)
+
+    # fill the missing hour of the change of hour in march at 3:00, the
+    # other missing hours are kept as gaps
+    filled = wb['dst_filled'].values
+    wb.loc[filled, HOURS] = wb.loc[filled, HOURS].ffill(axis='columns')
+
+    # create new column as a date object
+    wb['date'] = pd.to_datetime(wb['Day'])
+    del wb['Day']
+
+    # Add new columns with info about weekday, month and year
+    wb = datefeatures.add_date_features(wb)
+
+    # materialize the daily consumption
+    wb['daily'] = wb[HOURS].sum(axis=1)
+
+    return wb, quarantine, report
+
+
+def read_hourly_file(file_name, sheet='Statistics', skiprows=9,
+                     maxcolumns=26, hourchange='3B:00:00'):
+    """
+    This function parses one hourly consumption file, see parse_hourly_file
+    @return: A Pandas DataFrame object with the hourly consumption of the
+    file, without the quarantined rows
+    """
+    return parse_hourly_file(file_name, sheet, skiprows, maxcolumns,
+                             hourchange)[0]
+
+
+def apply_schema(df, hour_dtype='float32'):
+    """
+    This function applies the compact data types of the hourly data frame:
+    hours as hour_dtype, Country as categorical, weekday and month as int8
+    and year as int16
+    @param df: data frame built by read_hourly_file or the concatenation of
+    several of them
+    @param hour_dtype: data type of the hourly consumptions
+    @return: data frame with the new data types
+    """
+    dtypes = dict((hour, hour_dtype) for hour in HOURS + [DST_HOUR])
+    dtypes.update({'Country': 'category', 'weekday': 'int8', 'month': 'int8',
+                   'year': 'int16'})
+    return df.astype(dict((column, dtype) for column, dtype in dtypes.items()
+                          if column in df.columns))
+
+
+def rollup(df, by):
+    """
+    This function aggregates the hourly consumptions per Country, year and
+    another column (Ex: weekday or month). It keeps sums and counts, so the
+    rollups of several files or years can be added and the means computed
+    after, see rollup_means
+    @param df: hourly data frame
+    @param by: column to aggregate by. Ex: 'weekday', 'month'
+    @return: data frame indexed by (Country, year, by) with the sums of
+    H01,...,H24 and daily, their counts n_H01,...,n_H24, n_daily and the
+    number of days
+    """
+    values = df[HOURS + ['daily']].astype('float64')
+    counts = values.notnull().astype('int64')
+    counts.columns = ['n_' + column for column in values.columns]
+
+    table = pd.concat([values, counts], axis=1)
+    table['days'] = 1
+
+    table = table.groupby([df['Country'].astype(str).values,
+                           df['year'].values, df[by].values]).sum()
+    table.index.names = ['Country', 'year', by]
+    return table
+
+
+def combine_rollups(tables):
+    """
+    This function adds several rollups with the same keys, see rollup
+    @param tables: list of rollups
+    @return: data frame with the added rollups
+    """
+    table = pd.concat(tables)
+    return table.groupby(level=list(range(table.index.nlevels))).sum()
+
+
+def rollup_means(table, country_list=None, years=None):
+    """
+    This function computes the mean consumptions from a rollup, for some
+    countries and years
+    @param table: rollup of the hourly data frame, see rollup
+    @param country_list: list of countries or None for all of them
+    @param years: list of years or None for all of them
+    @return: data frame (Country, by, H01,...,H24, daily)
+    """
+    by = table.index.names[2]
+
+    mask = np.ones(len(table), dtype=bool)
+    if country_list is not None:
+        mask &= table.index.get_level_values('Country').isin(country_list)
+    if years is not None:
+        mask &= table.index.get_level_values('year').isin(years)
+
+    table = table[mask].groupby(level=['Country', by]).sum()
+
+    columns = HOURS + ['daily']
+    means = table[columns] / table[['n_' + column
+                                    for column in columns]].values
+    return means.reset_index()
+
+
+# rollups kept by HourlyPowerConsumptions
+ROLLUPS = ('weekday', 'month')
+
+
+def file_rollups(df):
+    """
+    This function computes all the rollups kept for a data frame
+    @param df: hourly data frame
+    @return: dictionary 'weekday' and 'month' -> rollup, see rollup
+    """
+    return dict((by, rollup(df, by)) for by in ROLLUPS)
+
+
+def normalize_hourly(df):
+    """
+    This function normalizes the hourly consumptions based on the daily
+    consumption, thus, the hourly consumptions per day are shown as values
+    between [0,1]
+    @param df: hourly data frame with the Country, year, month, weekday,
+    date, hours and daily columns
+    @return: data frame indexed by (Country, year, month, weekday, date)
+    with the normalized hourly consumptions
+    """
+    # Set index to make computations easier
+    df = df.set_index(['Country', 'year', 'month', 'weekday', 'date'])
+
+    # Do normalization based on the daily consumption
+    df = df[HOURS].div(df['daily'], axis='index')
+
+    return df
+
+
+def weekday_prototype(df, weekday):
+    """
+    This function computes the prototype hourly consumption of a weekday
+    from the average consumption per weekday and hour
+    @param df: data frame (Country, weekday, H01,...,H24, daily), see
+    HourlyPowerConsumptions.get_daily_aggregates_countries
+    @param weekday: day of the week. Ex: 'Monday', 'Tuesday', 'Working' (Monday to Friday), 'Weekend'
+    @return: data frame indexed by hour ('1',...,'24') with a column per
+    country, the values of each country have mean 1
+    """
+    df = df.drop('daily', axis=1)
+    df= df.set_index(['Country', 'weekday'])
+    dayDict={0:'Monday', 1:'Tuesday', 2:'Wednesday', 3:'Thrusday', 4:'Friday', 5:'Saturday', 6:'Sunday'}
+    df = df.rename(index=dayDict)
+
+
+    if weekday.lower() in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']:
+        df = df.T
+        # normalize values based on daily mean demand
+        df = df.div(df.mean())
+        df = df.xs(weekday, level='weekday', axis=1)
+    elif weekday.lower() == 'weekend':
+        df = df.reset_index()
+        df = df[df.weekday.isin(['Sunday', 'Saturday'])]
+        # the weekday names are not averaged
+        df = df.drop('weekday', axis=1).groupby(['Country']).mean()
+        # normalize values based on daily mean demand
+        df = df.T
+        df = df.div(df.mean())
+    elif weekday.lower() == 'working':
+        df = df.reset_index()
+        df = df[~df.weekday.isin(['Sunday', 'Saturday'])]
+        df = df.drop('weekday', axis=1).groupby(['Country']).mean()
+        # normalize values based on daily mean demand
+        df = df.T
+        df = df.div(df.mean())
+
+    df = df.rename(index=lambda x: re.sub(r'^H0*(\d{1,2})', '\\1', x))
+
+    # return only the selected columns
+    return df
+
+
+def memory_usage_report(df):
+    """
+    This function reports the memory used by each column of a data frame
+    @param df: data frame to check
+    @return: data frame with the data type and bytes of each column and a
+    last 'Total' row
+    """
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str),
+                           'bytes': df.memory_usage(index=False, deep=True)})
+    report.loc['Total'] = ['', int(df.memory_usage(index=True,
+                                                   deep=True).sum())]
+    return report[['dtype', 'bytes']]
+
+
+def _parse_hourly_file_args(args):
+    """
+    Unpack the arguments for parse_hourly_file, multiprocessing.Pool.map
+    only gives one argument to the function
+    """
+    return parse_hourly_file(*args)
+
+
+def iter_hourly_files(file_names, sheet='Statistics', skiprows=9,
+                      maxcolumns=26, hourchange='3B:00:00', workers=1):
+    """
+    This generator parses several hourly consumption files one at a time,
+    see parse_hourly_file, so only the file being used is kept in memory.
+    With workers > 1 the next files (at most workers - 1) are parsed while
+    the current one is used
+    @param file_names: list of excel files to be read
+    @param workers: number of processes used to parse the files, 1 to
+    parse them one after another in this process
+    @return: yields a (file name, data frame, quarantine, report) tuple per
+    file, in the same order
+    """
+    args = [(file_name, sheet, skiprows, maxcolumns, hourchange)
+            for file_name in file_names]
+
+    # each file is normalized independently
+    if workers > 1 and len(file_names) > 1:
+        workers = min(workers, len(file_names))
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            # at most workers files are parsed ahead of the one being used,
+            # the others wait until the results are taken
+            pending = deque()
+            for arg in args:
+                pending.append((arg[0], pool.apply_async(
+                    _parse_hourly_file_args, (arg,))))
+                if len(pending) >= workers:
+                    file_name, result = pending.popleft()
+                    yield (file_name,) + tuple(result.get())
+            while pending:
+                file_name, result = pending.popleft()
+                yield (file_name,) + tuple(result.get())
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for arg in args:
+            yield (arg[0],) + tuple(_parse_hourly_file_args(arg))
+
+
+def parse_hourly_files(file_names, sheet='Statistics', skiprows=9,
+                       maxcolumns=26, hourchange='3B:00:00', workers=1):
+    """
+    This function parses several hourly consumption files, see
+    parse_hourly_file
+    @param file_names: list of excel files to be read
+    @param workers: number of processes used to parse the files, 1 to
+    parse them one after another in this process
+    @return: list with a (data frame, quarantine, report) tuple per file, in
+    the same order
+    """
+    return [parsed[1:] for parsed in iter_hourly_files(
+        file_names, sheet, skiprows, maxcolumns, hourchange, workers)]
 
 
 class HourlyPowerConsumptions(object):
@@ -25,9 +361,80 @@ class HourlyPowerConsumptions(object):
     """
     DEFAULT_ENCODING = 'UTF-8'
 
+    # columnar store used instead of the in memory data frame, see from_store
+    store = None
+
+    # data type of the hourly consumptions, see apply_schema
+    hour_dtype = 'float32'
+
+    # engine used by the queries: 'pandas' or 'numpy', see set_engine
+    engine = 'pandas'
+    _cube = None
+
+    # long format view of the data frame, see get_hourly_series
+    _series = None
+
+    # number of daily aggregates kept by get_daily_aggregates_countries
+    aggregates_cache_size = 32
+    _df = None
+    _aggregates = None
+    _aggregates_stats = None
+    _rollups = None
+
+    # running prototype aggregates per alpha, see get_prototype_accumulator,
+    # and the files joined on the data frame they were built from
+    _accumulators = None
+    _joined_files = None
+
+    # rows that did not pass the checks and checks of each file, see
+    # validation.validate_hourly
+    quarantine = None
+    validation_report = None
+
+    @property
+    def df(self):
+        """
+        Data frame with the hourly consumptions, the memoized aggregates,
+        the rollups and the prototype accumulators are removed every time a
+        new data frame is set
+        """
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        self._df = df
+        self._rollups = None
+        self._accumulators = {}
+        self._joined_files = None
+        self.clear_aggregates_cache()
+
+    @property
+    def rollups(self):
+        """
+        Rollups of the data frame per (Country, year, weekday) and
+        (Country, year, month), see rollup. They are built at ingest time
+        or from the data frame the first time they are needed
+        """
+        if self._rollups is None and self._df is not None:
+            self._rollups = file_rollups(self._df)
+        return self._rollups
+
+    def _get_rollup(self, by, country_list, years):
+        """
+        Get the rollup of the data in memory or compute it from the rows of
+        the store that are selected
+        """
+        if self.store is None:
+            return self.rollups[by]
+
+        df = self._select(country_list, years,
+                          ['Country', 'year', by, 'daily'] + HOURS)
+        return rollup(df, by)
+
     # constructor
     def __init__(self, dir_path, pattern, sheet='Statistics', skiprows=9,
-                 maxcolumns=26, hourchange='3B:00:00', save=True):
+                 maxcolumns=26, hourchange='3B:00:00', save=True, workers=1,
+                 incremental=False, hour_dtype='float32'):
         """
         Constructor
         @param dir_path: The path where to search for the files
@@ -38,24 +445,44 @@ class HourlyPowerConsumptions(object):
         excel file (except for months with hour change)
         @param hourchange: label showing the hour change that makes a new
         column on the worksheet and should be treated
+        @param workers: number of processes used to parse the files
+        @param incremental: True to parse only the files that changed since
+        the last save, see update_dataframe
+        @param hour_dtype: data type of the hourly consumptions. Ex: 'float32'
+        or 'float64'
         @return: A Pandas DataFrame object with the hourly consumption
         """
-
-        # check if there is a saved data frame with the values
-        if os.path.isfile(os.path.join(dir_path, 'hconsum')):
-            self.df = pd.read_pickle(os.path.join(dir_path, 'hconsum'))
-        else:
+        self.hour_dtype = hour_dtype
+
+        # check if there is a saved data frame from the same files
+        key = cache.cache_key(glob.glob(dir_path + pattern), sheet=sheet,
+                              skiprows=skiprows, maxcolumns=maxcolumns,
+                              hourchange=hourchange, hour_dtype=hour_dtype,
+                              version=FORMAT_VERSION)
+        self.df = cache.load(dir_path, 'hconsum', key)
+        checks = cache.load(dir_path, 'hconsum.validation', key)
+        if checks is not None:
+            self.quarantine = checks['quarantine']
+            self.validation_report = checks['report']
+        if self.df is None and incremental:
+            self.update_dataframe(dir_path, pattern, sheet, skiprows,
+                                  maxcolumns, hourchange, save, workers)
+        elif self.df is None:
             self.load_dataframe(dir_path, pattern, sheet, skiprows,
-                                maxcolumns, hourchange, save)
+                                maxcolumns, hourchange, save, workers)
 
     # load data frame from files
+    @instrumentation.instrumented
     def load_dataframe(self, dir_path, pattern, sheet='Statistics', skiprows=9,
-                       maxcolumns=26, hourchange='3B:00:00', save=True):
+                       maxcolumns=26, hourchange='3B:00:00', save=True,
+                       workers=1):
         """
         This function parses hourly (1:24) consumption data from
         all countries and returns a Pandas DataFrame with the
         following schema:
         (country, day, H01, H02,...,H24, date, weekday,month, year)
+        The rows that do not pass the checks are kept on self.quarantine and
+        self.validation_report has the checks of each file
         @param dir_path: The path where to search for the files
         @param pattern: The pattern of the xlsx files to be read
         @param sheet: The sheet to be read
@@ -64,61 +491,361 @@ class HourlyPowerConsumptions(object):
         excel file (except for months with hour change)
         @param hourchange: label showing the hour change that makes a new
         column on the worksheet and should be treated
+        @param workers: number of processes used to parse the files, 1 to
+        parse them one after another in this process
         @return: A Pandas DataFrame object with the hourly consumption
         for all countries and all dates
         """
 
         print('_' * 80)
 
-        # create a DataFrame
-        self.df = pd.DataFrame()
+        # search for the files to load and parse them
+        file_names = glob.glob(dir_path + pattern)
+        parts = self._parse_files(file_names, sheet, skiprows, maxcolumns,
+                                  hourchange, workers)
 
-        # search for the files to load
-        for file_name in glob.glob(dir_path + pattern):
+        # concatenate all the files only once
+        self._join_files(file_names, parts)
 
-            print file_name
+        # save the data frame for latter use, to avoid reading all files again
+        if save:
+            self._save(dir_path, file_names, parts, sheet, skiprows,
+                       maxcolumns, hourchange)
 
-            # read excel file
-            wb = pd.read_excel(file_name, sheet, skiprows=skiprows,
-                               na_values=[u'n.a.'], keep_default_na=False)
+        return self.df
 
-            # check if there are more than maxcolumns since
-            # it means a change of hour
-            if len(wb.columns) != maxcolumns:
-                # take out the change of hour
-                del wb[hourchange]
-                # change columns name for 3A:00 to 3:00
-                wb = wb.rename(columns=lambda x:
-                re.sub(r'^(\d{1})A:.+', 'H0\\1', x))
+    @instrumentation.instrumented
+    def update_dataframe(self, dir_path, pattern, sheet='Statistics',
+                         skiprows=9, maxcolumns=26, hourchange='3B:00:00',
+                         save=True, workers=1):
+        """
+        This function refreshes the data frame parsing only the files that
+        are new or changed since the last time they were saved. The rows of
+        a changed file replace the rows it had before and the rows of a file
+        that is not found anymore are removed. Same parameters and result
+        than load_dataframe
+        @return: A Pandas DataFrame object with the hourly consumption
+        for all countries and all dates
+        """
 
-            # change columns names if they are hours for H01, H02,...
-            wb = wb.rename(columns=lambda x: re.sub(r'^(\d{2}):.+', 'H\\1', x))
+        print('_' * 80)
 
-            # remove rows if they have too many NaN (at least the 23 non NaN)
-            wb = wb.dropna(thresh=23)
+        # per file data frames saved on the last load or update
+        key = cache.cache_key([], sheet=sheet, skiprows=skiprows,
+                              maxcolumns=maxcolumns, hourchange=hourchange,
+                              version=FORMAT_VERSION)
+        parts = cache.load(dir_path, 'hconsum.parts', key) or {}
+
+        # parse only the new and changed files, the rollups and checks of
+        # the files that did not change are not computed again
+        file_names = glob.glob(dir_path + pattern)
+        changed = cache.changed_files(parts, file_names)
+        parts.update(self._parse_files(changed, sheet, skiprows, maxcolumns,
+                                       hourchange, workers))
+
+        # the prototype accumulators only need the new files when the other
+        # files are the ones they already have
+        accumulators = self._accumulators
+        appended = (self._joined_files is not None and
+                    set(file_names) - set(changed) ==
+                    set(self._joined_files))
+
+        # splice the files in the same order than load_dataframe
+        self._join_files(file_names, parts)
+
+        if accumulators and appended:
+            for accumulator in accumulators.values():
+                accumulator.add_parts([parts[file_name]
+                                       for file_name in changed])
+            self._accumulators = accumulators
 
-            # fill missing values from the change of hour in march at 3:00
-            wb = wb.fillna(method='pad', axis='columns')
+        if save:
+            self._save(dir_path, file_names, parts, sheet, skiprows,
+                       maxcolumns, hourchange)
 
-            # create new column as a date object
-            wb['date'] = pd.to_datetime(wb['Day'])
-            del wb['Day']
+        return self.df
 
+    def _parse_files(self, file_names, sheet, skiprows, maxcolumns,
+                     hourchange, workers):
+        """
+        Parse some files and compute their rollups
+        @return: dictionary file name -> {'df', 'quarantine', 'report',
+        'rollups'}
+        """
+        parts = {}
+        for file_name, df, quarantine, report in iter_hourly_files(
+                file_names, sheet, skiprows, maxcolumns, hourchange, workers):
+            parts[file_name] = {'df': df, 'quarantine': quarantine,
+                                'report': report, 'rollups': file_rollups(df)}
+        return parts
+
+    def _join_files(self, file_names, parts):
+        """
+        Build the data frame, its rollups, the quarantined rows and the
+        validation report from the parts of each file
+        """
+        parts = [parts[file_name] for file_name in file_names]
+
+        if parts:
+            self.df = apply_schema(pd.concat([part['df'] for part in parts]),
+                                   self.hour_dtype)
+            self.quarantine = pd.concat([part['quarantine']
+                                         for part in parts])
+
+            # the rollups of the whole data frame are the sum of the files ones
+            self._rollups = dict((by, combine_rollups([part['rollups'][by]
+                                                       for part in parts]))
+                                 for by in ROLLUPS)
+        else:
+            self.df = pd.DataFrame()
+            self.quarantine = pd.DataFrame()
+
+        self.validation_report = validation.report_frame(part['report']
+                                                         for part in parts)
+        self._joined_files = list(file_names)
+
+    def _save(self, dir_path, file_names, parts, sheet, skiprows, maxcolumns,
+              hourchange):
+        """
+        Save the data frame, the checks and the per file parts used by
+        update_dataframe
+        """
+        key = cache.cache_key(file_names, sheet=sheet, skiprows=skiprows,
+                              maxcolumns=maxcolumns, hourchange=hourchange,
+                              hour_dtype=self.hour_dtype,
+                              version=FORMAT_VERSION)
+        cache.save(dir_path, 'hconsum', key, self.df)
+        cache.save(dir_path, 'hconsum.validation', key,
+                   {'quarantine': self.quarantine,
+                    'report': self.validation_report})
+
+        key = cache.cache_key([], sheet=sheet, skiprows=skiprows,
+                              maxcolumns=maxcolumns, hourchange=hourchange,
+                              version=FORMAT_VERSION)
+        cache.save(dir_path, 'hconsum.parts', key,
+                   cache.make_parts(file_names, parts))
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Build an object that answers the queries reading only the needed
+        partitions and columns from a columnar store instead of keeping all
+        the data in memory
+        @param store: store.ColumnarStore partitioned by Country and year,
+        see save_to_store
+        @return: HourlyPowerConsumptions object without the df in memory
+        """
+        hpc = cls.__new__(cls)
+        hpc.df = None
+        hpc.store = store
+        return hpc
 
-            # Add new columns with info about weekday, month and year
-            wb['weekday'] = wb.date.apply(lambda x: x.weekday())
-            wb['month'] = wb.date.apply(lambda x: x.month)
-            wb['year'] = wb.date.apply(lambda x: x.year)
+    def save_to_store(self, store):
+        """
+        This function saves the data frame on a columnar store, replacing
+        the data that it had
+        @param store: store.ColumnarStore partitioned by Country and year
+        @return: n/a
+        """
+        store.clear()
+        store.write(self.df)
 
-            # Append to the self.df data frame
-            self.df = self.df.append(wb)
+    @classmethod
+    def stream_to_store(cls, dir_path, pattern, store, sheet='Statistics',
+                        skiprows=9, maxcolumns=26, hourchange='3B:00:00',
+                        workers=1, hour_dtype='float32', clear=True):
+        """
+        Build an object that uses a columnar store (see from_store) writing
+        each file to the store as soon as it is parsed, so the memory used
+        does not grow with the number of files. Same parameters than
+        load_dataframe
+        @param store: store.ColumnarStore partitioned by Country and year
+        @param hour_dtype: data type of the hourly consumptions
+        @param clear: True to remove the data the store had before, False to
+        add or replace only the files that are read
+        @return: HourlyPowerConsumptions object without the df in memory,
+        with the quarantined rows and the validation report of the files
+        """
+        print('_' * 80)
 
+        if clear:
+            store.clear()
+
+        quarantines = []
+        reports = []
+        for file_name, df, quarantine, report in iter_hourly_files(
+                glob.glob(dir_path + pattern), sheet, skiprows, maxcolumns,
+                hourchange, workers):
+            # the name of the file is used for its parts on the store so a
+            # file read again replaces its old rows
+            name = os.path.splitext(os.path.basename(file_name))[0]
+            store.write(apply_schema(df, hour_dtype), name=name)
+            quarantines.append(quarantine)
+            reports.append(report)
+
+        hpc = cls.from_store(store)
+        hpc.hour_dtype = hour_dtype
+        hpc.quarantine = (pd.concat(quarantines) if quarantines
+                          else pd.DataFrame())
+        hpc.validation_report = validation.report_frame(reports)
+        return hpc
+
+    def memory_usage(self):
+        """
+        This function reports the memory used by the data frame
+        @return: data frame with the data type and bytes of each column and a
+        last 'Total' row, see memory_usage_report
+        """
+        return memory_usage_report(self.df)
 
-        # save the data frame for latter use, to avoid reading all files again
-        if save:
-            self.df.to_pickle(os.path.join(dir_path, 'hconsum'))
+    def clear_aggregates_cache(self):
+        """
+        This function removes the memoized daily aggregates, it is done
+        automatically when the data frame is loaded again
+        @return: n/a
+        """
+        self._aggregates = OrderedDict()
+        self._aggregates_stats = {'hits': 0, 'misses': 0}
+
+    def aggregates_cache_info(self):
+        """
+        This function gets information about the memoized daily aggregates
+        @return: dictionary with 'hits', 'misses', 'size' and 'maxsize'
+        """
+        info = dict(self._aggregates_stats)
+        info['size'] = len(self._aggregates)
+        info['maxsize'] = self.aggregates_cache_size
+        return info
+
+    def set_engine(self, engine):
+        """
+        This function selects how the queries are computed
+        @param engine: 'pandas' to work on the data frame or 'numpy' to work on
+        a (country, day, hour) array built from it, see hourlycube.HourlyCube
+        @return: n/a
+        """
+        if engine not in ('pandas', 'numpy'):
+            raise ValueError("Unknown engine: " + str(engine))
+        if engine == 'numpy' and self.df is None:
+            raise ValueError("The numpy engine needs the data frame in memory")
+        self.engine = engine
+
+    def get_cube(self):
+        """
+        This function gets the (country, day, hour) array of the data frame,
+        it is built again when the data frame changes
+        @return: hourlycube.HourlyCube object
+        """
+        # imported here since hourlycube uses this module
+        import hourlycube
+
+        if self._cube is None or self._cube_df is not self.df:
+            self._cube = hourlycube.HourlyCube(self.df)
+            self._cube_df = self.df
+        return self._cube
+
+    def get_prototype_accumulator(self, alpha=None):
+        """
+        This function gets the running aggregates per country, weekday and
+        hour of the data frame, built from its weekday rollup. update_dataframe
+        adds the new files to them instead of building them again
+        @param alpha: smoothing factor of the exponentially weighted means or
+        None, see prototypes.PrototypeAccumulator
+        @return: prototypes.PrototypeAccumulator object
+        """
+        # imported here since prototypes uses this module
+        import prototypes
+
+        if alpha not in self._accumulators:
+            accumulator = prototypes.PrototypeAccumulator(alpha)
+            accumulator.add_parts([{'df': self.df, 'rollups': self.rollups}])
+            self._accumulators[alpha] = accumulator
+        return self._accumulators[alpha]
 
+    def get_hourly_series(self, timezone=None):
+        """
+        This function gets the hourly consumptions in long format, one value
+        per country and UTC hour, it is built again when the data frame
+        changes
+        @param timezone: time zone of the hours of the files to use instead
+        of hourlyseries.FILES_TIMEZONE
+        @return: hourlyseries.HourlySeries object
+        """
+        # imported here since hourlyseries uses this module
+        import hourlyseries
 
+        # the view of a store is not kept, the store can change
+        if timezone is not None or self.store is not None:
+            return hourlyseries.HourlySeries(self._series_frame(), timezone)
+
+        if self._series is None or self._series_df is not self.df:
+            self._series = hourlyseries.HourlySeries(self._series_frame())
+            self._series_df = self.df
+        return self._series
+
+    def _series_frame(self):
+        """
+        Columns used by the long format view
+        """
+        if self.store is not None:
+            return self._select(columns=['Country', 'date'] + HOURS +
+                                [DST_HOUR])
+        return self.df
+
+    def add_date_features(self, features=('isoweek', 'dayofyear', 'holiday'),
+                          holidays=None):
+        """
+        This function adds more calendar information to the data frame
+        @param features: list with the features to add, see
+        datefeatures.FEATURES
+        @param holidays: list of dates that are holidays for all the countries
+        or a dictionary country -> list of dates. Ex: {'ES': ['2014-01-06']}
+        @return: the data frame with the new columns
+        """
+        return datefeatures.add_date_features(self.df, features=features,
+                                              holidays=holidays)
+
+    def _select(self, country_list=None, years=None, columns=None):
+        """
+        Select the rows of some countries and years and some columns, from
+        the store if there is one or from the data frame
+        @param country_list: list of countries or None for all of them
+        @param years: list of years or None for all of them
+        @param columns: list of columns or None for all of them
+        @return: data frame with the selected data, a new data frame that
+        never shares its values with self.df
+        """
+        if self.store is not None:
+            filters = {}
+            if country_list is not None:
+                filters['Country'] = country_list
+            if years is not None:
+                filters['year'] = years
+            return self.store.read(filters, columns)
+
+        # Build the mask of the rows to select before copying anything
+        mask = pd.Series(True, index=self.df.index)
+
+        # Select the years to consider
+        if years is not None:
+            mask &= self.df.year.isin(years)
+
+        # Select the countries to work with
+        if country_list is not None:
+            mask &= self.df.Country.isin(country_list)
+
+        if columns is None:
+            columns = self.df.columns
+
+        # only the selected rows and columns are copied
+        df = self.df.loc[mask.values, columns].copy()
+
+        if 'Country' in df.columns and hasattr(df.Country, 'cat'):
+            df['Country'] = df.Country.cat.remove_unused_categories()
+
+        return df
+
+    @instrumentation.instrumented
     def historical_daily_aggregates(self, country, year, num_years=3):
         """
         Obtain a new data frame with historical daily aggregate consumption
@@ -129,25 +856,20 @@ class HourlyPowerConsumptions(object):
         @param num_years: Number of previous years to get the historical
         @return data frame with the daily aggregated consumption
         """
+        if self.engine == 'numpy':
+            return self.get_cube().historical_daily_aggregates(
+                country, range(year - num_years, year + 1))
 
-        df = self.df.copy(deep=True)
-
-        # Select the years to consider
-        df = df[df.year.isin(range(year - num_years, year + 1))]
-
-        # Select the country to work with
-        df = df[df.Country == country]
-
-        # reset index to give a plain data frame
-        df = df.reset_index()
+        # Select the country, the years to consider and the daily values
+        df = self._select([country], range(year - num_years, year + 1),
+                          ['date', 'weekday', 'month', 'year', 'daily'])
 
-        # sum daily values
-        df.iloc[:,2:26] = df.iloc[:,2:26].astype(float)
-        df['daily'] = df.iloc[:,2:26].sum(axis=1)
-
-        # return only the selected columns
-        return df[['date', 'weekday', 'month', 'year', 'daily']]
+        # sorted by date with a plain index and the schema data types, as
+        # the numpy engine gives
+        df = df.sort_values('date', kind='mergesort')
+        return apply_schema(df.reset_index(drop=True))
 
+    @instrumentation.instrumented
     def normalized_hourly_country_data(self, country):
 
         """
@@ -157,26 +879,31 @@ class HourlyPowerConsumptions(object):
         @param country: country to select
         @return: data frame with the country normalized hourly consumptions
         """
-        df = self.df.copy(deep=True)
-
-        # Select values only for this country
-        df = df[df.Country == country]
-
-        # Set index to make computations easier
-        df = df.set_index(['Country', 'year', 'month',
-                           'weekday', 'date'])
+        return self.normalized_hourly_countries_data([country])
 
-        # sum daily values
-        df.iloc[:,2:26] = df.iloc[:,2:26].astype(float)
-        df['daily'] = df.iloc[:,2:26].sum(axis=1)
+    @instrumentation.instrumented
+    def normalized_hourly_countries_data(self, country_list=None, workers=1):
+        """
+        This function normalizes the hourly consumptions of several countries
+        based on the daily consumption, selecting all of them at once
+        @param country_list: list of countries to select or None for all of
+        them
+        @param workers: number of processes, see parallel.apply_by_group
+        @return: data frame indexed by (Country, year, month, weekday, date)
+        with the normalized hourly consumptions of all the countries
+        """
+        # Select values only for these countries
+        df = self._select(country_list, columns=['Country', 'year', 'month',
+                                                 'weekday', 'date'] + HOURS +
+                                                ['daily'])
 
-        # Do normalization based on the daily consumption
-        df = df.div(df.daily, axis='index')
-        del df['daily']
+        df = parallel.apply_by_group(normalize_hourly, df, 'Country',
+                                     workers)
 
         # return the dataframe
-        return df
+        return df.sort_index()
 
+    @instrumentation.instrumented
     def get_daily_aggregates_countries(self, country_list, year="", num_years=""):
         """
         Obtain a new data frame with historical daily aggregate consumption
@@ -188,35 +915,64 @@ class HourlyPowerConsumptions(object):
         @return data frame with the daily aggregated consumption
         """
 
-        df = self.df.copy(deep=True)
+        # Look for the same query on the memoized aggregates
+        key = (frozenset(country_list), year, num_years, self.engine)
+        if key in self._aggregates:
+            self._aggregates_stats['hits'] += 1
+            df = self._aggregates.pop(key)
+        else:
+            self._aggregates_stats['misses'] += 1
+            df = self._daily_aggregates_countries(country_list, year,
+                                                  num_years)
+
+        # the most recent query goes to the end, the oldest one is removed
+        self._aggregates[key] = df
+        while len(self._aggregates) > self.aggregates_cache_size:
+            self._aggregates.popitem(last=False)
+
+        # the callers change the data frame they get
+        return df.copy()
+
+    def _daily_aggregates_countries(self, country_list, year, num_years):
+        """
+        Compute the data frame of get_daily_aggregates_countries
+        """
 
         # Select the years to consider
+        years = None
         if year != "" or num_years != "":
-            df = df[df.year.isin(range(year - num_years, year + 1))]
+            years = range(year - num_years, year + 1)
 
-        # Select the country to work with
-        df = df[df.Country.isin(country_list)]
+        if self.engine == 'numpy':
+            return self.get_cube().daily_aggregates(country_list, years)
 
-        # Some H01 have a problem and have strange values
-        df.H01 = df.H01.astype(str)
-        df = df[df['H01'].str.contains("-")!=True]
+        # Average per day and hour from the sums and counts of the rollup
+        table = self._get_rollup('weekday', country_list, years)
+        return rollup_means(table, country_list, years)
 
-        # sum daily values
-        df.iloc[:,1:25] = df.iloc[:,1:25].astype(float)
-        df['daily'] = df.iloc[:,1:25].sum(axis=1)
+    @instrumentation.instrumented
+    def get_monthly_aggregates_countries(self, country_list, year="",
+                                         num_years=""):
+        """
+        Obtain a new data frame with the average hourly and daily consumption
+        per month for several countries
+        @rtype : data frame
+        @param country_list: countries to select. Ex: ["ES", "PT"]
+        @param year: reference year to compute the historical data or "" to use all available years
+        @param num_years: Number of previous years to get the historical or "" to use all available years
+        @return data frame (Country, month, H01,...,H24, daily)
+        """
 
-        # remove not needed columns
-        del df['month']
-        del df['year']
-        del df['date']
+        # Select the years to consider
+        years = None
+        if year != "" or num_years != "":
+            years = range(year - num_years, year + 1)
 
-        # Average per day and hour
-        df = df.groupby(['Country','weekday']).mean()
-        df = df.reset_index()
-
-        # return only the selected columns
-        return df
+        # Average per month and hour from the sums and counts of the rollup
+        table = self._get_rollup('month', country_list, years)
+        return rollup_means(table, country_list, years)
 
+    @instrumentation.instrumented
     def get_hourly_aggregates_countries(self, country_list, year="", num_years=""):
         """
         Obtain a new data frame with historical hourly aggregate consumption
@@ -247,6 +1003,7 @@ class HourlyPowerConsumptions(object):
         return df
 
 
+    @instrumentation.instrumented
     def get_hourly_prototype_countries(self, country_list, year="", num_years=""):
         """
         Obtain a new data frame with prototype hourly consumption
@@ -278,6 +1035,7 @@ class HourlyPowerConsumptions(object):
         # return only the selected columns
         return df
 
+    @instrumentation.instrumented
     def get_hourly_prototype_weekday_countries(self, weekday, country_list, year="", num_years=""):
         """
         Obtain a new data frame with prototype hourly consumption
@@ -292,33 +1050,4 @@ class HourlyPowerConsumptions(object):
 
         df = self.get_daily_aggregates_countries(country_list, year=year, num_years=num_years)
 
-        del df['daily']
-        df= df.set_index(['Country', 'weekday'])
-        dayDict={0:'Monday', 1:'Tuesday', 2:'Wednesday', 3:'Thrusday', 4:'Friday', 5:'Saturday', 6:'Sunday'}
-        df = df.rename(index=dayDict)
-
-
-        if weekday.lower() in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']:
-            df = df.T
-            # normalize values based on daily mean demand
-            df = df.div(df.mean())
-            df = df.xs(weekday, level='weekday', axis=1)
-        elif weekday.lower() == 'weekend':
-            df = df.reset_index()
-            df = df[df.weekday.isin(['Sunday', 'Saturday'])]
-            df = df.groupby(['Country']).mean()
-            # normalize values based on daily mean demand
-            df = df.T
-            df = df.div(df.mean())
-        elif weekday.lower() == 'working':
-            df = df.reset_index()
-            df = df[~df.weekday.isin(['Sunday', 'Saturday'])]
-            df = df.groupby(['Country']).mean()
-            # normalize values based on daily mean demand
-            df = df.T
-            df = df.div(df.mean())
-
-        df = df.rename(index=lambda x: re.sub(r'^H0*(\d{1,2})', '\\1', x))
-
-        # return only the selected columns
-        return df
\ No newline at end of file
+        return weekday_prototype(df, weekday)
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+This module provides a long format view of the hourly consumptions: one value
+per country and UTC hour, sorted, so time ranges are found by binary search
+and resampling works on the values without reshaping the wide data frame.
+The hours of the files are CET/CEST hours for all the countries (the
+layout validation expects): the hour that does not exist in March is removed
+and the two 2:00 hours of October (3A and 3B columns) are both kept
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# columns with the hourly consumptions
+from hourlypowerconsumptions import HOURS, DST_HOUR
+
+# time zone of the hours of the files, the 3A and 3B columns and the hour
+# filled in March (see validation.spring_forward) are on its changes of time
+FILES_TIMEZONE = 'Europe/Brussels'
+
+
+class HourlySeries(object):
+    """
+        This class contains the hourly consumptions as sorted arrays of UTC
+        timestamps and values, one block per country
+    """
+
+    # constructor
+    def __init__(self, df, timezone=None):
+        """
+        Constructor
+        @param df: hourly data frame (Country, date, H01,...,H24, H03B) as
+        built by HourlyPowerConsumptions
+        @param timezone: time zone of the hours of the data frame to use
+        instead of FILES_TIMEZONE, the same for all the countries
+        """
+        timezone = timezone or FILES_TIMEZONE
+        columns = HOURS + ([DST_HOUR] if DST_HOUR in df.columns else [])
+
+        # the hour each column starts at and if it is the summer (first)
+        # hour when the clock goes back
+        offsets = np.array([hour for hour in range(24)] +
+                           [2] * (len(columns) - 24), dtype='int64')
+        summer = np.array([True] * 24 + [False] * (len(columns) - 24))
+
+        countries = df['Country'].astype(str).values
+        days = pd.to_datetime(df['date']).values.astype('datetime64[D]')
+        values = df[columns].values
+
+        # all the countries at once, their files use the same time zone
+        local = (days.astype('datetime64[ns]')[:, np.newaxis] +
+                 offsets[np.newaxis, :].astype('timedelta64[h]')).ravel()
+        utc = pd.DatetimeIndex(local).tz_localize(
+            timezone, ambiguous=np.tile(summer, len(days)),
+            nonexistent='NaT').asi8.reshape(len(days), len(columns))
+
+        # the extra hour only exists the day the clock goes back, the other
+        # days it is the same hour than H03
+        keep = utc != np.iinfo('int64').min
+        if len(columns) > 24:
+            keep[:, 24] &= utc[:, 24] != utc[:, 2]
+        keep &= ~np.isnan(values.astype('float64'))
+
+        self.countries = sorted(set(countries))
+        self.bounds = {}
+        times = []
+        data = []
+        start = 0
+        for country in self.countries:
+            rows = countries == country
+            country_keep = keep[rows]
+            country_times = utc[rows][country_keep]
+            order = np.argsort(country_times, kind='mergesort')
+
+            times.append(country_times[order])
+            data.append(values[rows][country_keep][order])
+            self.bounds[country] = (start, start + len(order))
+            start += len(order)
+
+        self.times = (np.concatenate(times) if times
+                      else np.array([], dtype='int64'))
+        self.values = (np.concatenate(data) if data
+                       else np.array([], dtype=values.dtype))
+
+    def _country(self, country, start=None, end=None):
+        """
+        Positions of the values of a country between two times, found by
+        binary search on the sorted timestamps
+        """
+        if country not in self.bounds:
+            return 0, 0
+        first, last = self.bounds[country]
+        times = self.times[first:last]
+
+        if start is not None:
+            first += np.searchsorted(times, _utc(start), side='left')
+        if end is not None:
+            last = self.bounds[country][0] + np.searchsorted(
+                times, _utc(end), side='left')
+        return first, max(first, last)
+
+    def country_range(self, country, start=None, end=None):
+        """
+        This function selects the hourly consumptions of a country in a time
+        range
+        @param country: country to select. Ex: 'ES'
+        @param start: first time (included) or None. Times without time zone
+        are UTC. Ex: '2012-10-28 00:00'
+        @param end: last time (excluded) or None
+        @return: series indexed by UTC timestamp
+        """
+        first, last = self._country(country, start, end)
+        return pd.Series(self.values[first:last],
+                         index=pd.DatetimeIndex(
+                             self.times[first:last].astype('datetime64[ns]'),
+                             name='timestamp').tz_localize('UTC'),
+                         name=country)
+
+    def series(self, country_list=None, start=None, end=None):
+        """
+        This function gets the long format series of several countries
+        @param country_list: list of countries or None for all of them
+        @param start: first time (included) or None
+        @param end: last time (excluded) or None
+        @return: series indexed by (Country, timestamp)
+        """
+        countries = [country for country in self.countries
+                     if country_list is None or country in country_list]
+        parts = [self.country_range(country, start, end)
+                 for country in countries]
+        if not parts:
+            return pd.Series([], name='consumption', dtype=self.values.dtype)
+
+        series = pd.concat(parts, keys=countries,
+                           names=['Country', 'timestamp'])
+        series.name = 'consumption'
+        return series
+
+    def resample(self, rule='W', how='sum', country_list=None, start=None,
+                 end=None, timezone=None):
+        """
+        This function aggregates the hourly consumptions of each country by
+        periods, working directly on the sorted values
+        @param rule: pandas frequency. Ex: 'D', 'W', 'MS'
+        @param how: aggregation. Ex: 'sum', 'mean', 'max'
+        @param country_list: list of countries or None for all of them
+        @param start: first time (included) or None
+        @param end: last time (excluded) or None
+        @param timezone: time zone of the periods or None for UTC. Ex:
+        'Europe/Madrid' so the months start at the local midnight
+        @return: data frame indexed by period with a column per country
+        """
+        countries = [country for country in self.countries
+                     if country_list is None or country in country_list]
+
+        columns = {}
+        for country in countries:
+            series = self.country_range(country, start, end).astype('float64')
+            if timezone is not None:
+                series.index = series.index.tz_convert(timezone)
+            columns[country] = getattr(series.resample(rule), how)()
+
+        return pd.DataFrame(columns, columns=countries)
+
+
+def _utc(time):
+    """
+    Nanoseconds since the epoch of a time, UTC if it has no time zone
+    """
+    time = pd.Timestamp(time)
+    if time.tzinfo is None:
+        time = time.tz_localize('UTC')
+    return time.value
@@ -0,0 +1,188 @@
+"""
+This module provides an opt-in instrumentation of the loaders and the queries
+of the power consumptions classes. When it is enabled each call records its
+wall time, the rows of the object data frame and of the result and, if asked,
+the peak memory it allocated. When it is disabled the methods only pay one
+flag check
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# wrapped methods keep their name and docstring
+import functools
+# timing
+import time
+# counters of the cache of the parsed data frames
+import cache
+
+try:
+    # memory allocated by the calls, python >= 3.4
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# instrumentation state, see enable
+_state = {'enabled': False, 'memory': False, 'callbacks': [], 'depth': 0}
+
+# totals per method: name -> {'calls', 'time', 'rows_in', 'rows_out',
+# 'memory'}
+_stats = {}
+
+# columns of the stats data frame
+STATS_COLUMNS = ['calls', 'time', 'rows_in', 'rows_out', 'memory']
+
+
+def enable(memory=False, callback=None):
+    """
+    This function starts recording the calls of the instrumented methods
+    @param memory: True to also record the peak memory allocated by each
+    call with tracemalloc, it makes the calls slower
+    @param callback: function called with a dictionary ('name', 'time',
+    'rows_in', 'rows_out', 'memory') after each call. Ex: log_callback()
+    @return: n/a
+    """
+    _state['enabled'] = True
+    _state['memory'] = memory and tracemalloc is not None
+    if callback is not None:
+        _state['callbacks'].append(callback)
+    if _state['memory'] and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """
+    This function stops recording the calls and removes the callbacks, the
+    recorded stats are kept
+    @return: n/a
+    """
+    _state['enabled'] = False
+    _state['callbacks'] = []
+    if _state['memory'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state['memory'] = False
+
+
+def is_enabled():
+    """
+    @return: True if the calls are being recorded
+    """
+    return _state['enabled']
+
+
+def reset():
+    """
+    This function removes the recorded stats and the cache counters
+    @return: n/a
+    """
+    _stats.clear()
+    cache.reset_stats()
+
+
+def stats():
+    """
+    This function gives the recorded stats
+    @return: dictionary with 'calls' (method name -> totals of its calls)
+    and 'cache' (hits and misses of the cache of the parsed data frames).
+    The counters of the memoized daily aggregates of each object are given
+    by HourlyPowerConsumptions.aggregates_cache_info
+    """
+    return {'calls': dict((name, dict(totals))
+                          for name, totals in _stats.items()),
+            'cache': cache.stats()}
+
+
+def stats_frame():
+    """
+    This function gives the recorded stats as a data frame
+    @return: data frame indexed by method name with the calls, total time
+    in seconds, rows in and out and the max peak memory in bytes
+    """
+    df = pd.DataFrame.from_dict(_stats, orient='index')
+    return df.reindex(columns=STATS_COLUMNS).sort_index()
+
+
+def log_callback(logger=None, level=None):
+    """
+    This function builds a callback that logs each call
+    @param logger: logging.Logger or None to use the 'instrumentation' one
+    @param level: logging level or None for logging.INFO
+    @return: function to give to enable
+    """
+    import logging
+    logger = logger or logging.getLogger('instrumentation')
+    level = logging.INFO if level is None else level
+
+    def callback(record):
+        logger.log(level, '%(name)s: %(time).6fs rows %(rows_in)s -> '
+                          '%(rows_out)s memory %(memory)s', record)
+    return callback
+
+
+def _rows(value):
+    """
+    Number of rows of a data frame or series, None for other values
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def _record(record):
+    """
+    Add a call to the totals and give it to the callbacks
+    """
+    totals = _stats.setdefault(record['name'],
+                               {'calls': 0, 'time': 0.0, 'rows_in': 0,
+                                'rows_out': 0, 'memory': 0})
+    totals['calls'] += 1
+    totals['time'] += record['time']
+    totals['rows_in'] += record['rows_in'] or 0
+    totals['rows_out'] += record['rows_out'] or 0
+    totals['memory'] = max(totals['memory'], record['memory'] or 0)
+
+    for callback in _state['callbacks']:
+        callback(record)
+
+
+def instrumented(method):
+    """
+    Decorator of the methods to instrument. The rows in are the rows of the
+    data frame of the object (self.df) and the rows out the rows of the result
+    @param method: method of a class with a df attribute
+    @return: the wrapped method
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _state['enabled']:
+            return method(self, *args, **kwargs)
+
+        rows_in = _rows(getattr(self, 'df', None))
+        memory = _state['memory'] and tracemalloc.is_tracing()
+        if memory:
+            start_memory = tracemalloc.get_traced_memory()[0]
+            # the peak of a call made by another instrumented call is not
+            # reset, so the outer call keeps its own peak
+            if _state['depth'] == 0 and hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+
+        _state['depth'] += 1
+        start = time.time()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            _state['depth'] -= 1
+        elapsed = time.time() - start
+
+        peak = None
+        if memory:
+            peak = max(tracemalloc.get_traced_memory()[1] - start_memory, 0)
+
+        _record({'name': type(self).__name__ + '.' + method.__name__,
+                 'time': elapsed, 'rows_in': rows_in,
+                 'rows_out': _rows(result), 'memory': peak})
+        return result
+
+    return wrapper
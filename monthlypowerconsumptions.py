@@ -9,6 +9,8 @@ __email__ = "mtolos@tid.es"
 # import packages for analysis and modeling
 # data frame operations
 import pandas as pd
+# array operations
+import numpy as np
 # pathname pattern expansion
 import glob
 # dates treatment
@@ -18,6 +20,86 @@ import os
 import re
 # import datetime for dealing with time expressions
 import datetime
+# cache of the parsed data frames
+import cache
+# calls instrumentation
+import instrumentation
+# worksheets reader
+import excelreader
+# computations split by country
+import parallel
+
+# version of the data frames built by read_monthly_file, it is part of the
+# cache keys so the saved data frames are parsed again when it changes
+FORMAT_VERSION = 2
+
+# columns of the monthly consumptions and their names
+MONTH_COLUMNS = [str(month) for month in range(1, 13)]
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep',
+          'Oct', 'Nov', 'Dec']
+
+
+def read_monthly_file(file_name, sheet='Statistics', skiprows=7):
+    """
+    This function parses one monthly consumption file
+    @param file_name: The excel file to be read
+    @param sheet: The sheet to be read
+    @param skiprows: rows to skip from the excel file
+    @return: A Pandas DataFrame object with the monthly consumption of the
+    file and a year column (None if the file has no "Year:" cell)
+    """
+
+    print(file_name)
+
+    # read excel file once, the year is on the header rows
+    header, wb = excelreader.read_sheet(file_name, sheet, skiprows)
+    year = excelreader.header_value(header, "Year:")
+
+    # add year to data frame
+    wb['year'] = year
+
+    return wb
+
+
+def normalize_monthly(df):
+    """
+    This function normalizes the monthly consumptions based on the yearly
+    consumption, thus, the monthly consumptions per year are shown as values
+    between [0,1]
+    @param df: monthly data frame with the country and year columns, see
+    MonthlyPowerConsumptions.arrange_months_names
+    @return: data frame indexed by (country, year) with the normalized
+    monthly consumptions
+    """
+    # Set index to make computations easier
+    df = df.set_index(['country', 'year'])
+
+    # Do normalization based on the yearly consumption
+    yearly_consumption = df.sum(axis=1)
+    df = df.div(yearly_consumption, axis='index')
+
+    return df
+
+
+def long_monthly(df):
+    """
+    This function converts the monthly consumptions to long format, one row
+    per country, year and month, in the same order than the rows and the
+    months of the data frame. The rows without year are left out
+    @param df: monthly data frame (country, Sum, 1,...,12, year)
+    @return: data frame with the country (category), year (int16), month
+    (int8, 1 to 12) and value (float64) columns
+    """
+    df = df[df['year'].notnull()]
+    values = df[MONTH_COLUMNS].to_numpy('float64')
+
+    return pd.DataFrame({
+        'country': pd.Categorical(np.repeat(
+            df['country'].astype(str).to_numpy(object), 12)),
+        'year': np.repeat(df['year'].to_numpy('float64'), 12).astype('int16'),
+        'month': np.tile(np.arange(1, 13, dtype='int8'), len(df)),
+        'value': values.ravel()})
+
 
 class MonthlyPowerConsumptions(object):
     """
@@ -26,27 +108,40 @@ class MonthlyPowerConsumptions(object):
     """
     DEFAULT_ENCODING = 'UTF-8'
 
+    # columnar store used instead of the in memory data frame, see from_store
+    store = None
+
+    # long format view of the data frame, see get_monthly_series
+    _series = None
+
     #_monthDict={'1':'Jan', '2':'Feb', '3':'Mar', '4':'Apr', '5':'May', '6':'Jun', '7':'Jul', '8':'Aug', '9':'Sep', '10':'Oct', '11':'Nov', '12':'Dec'}
 
 
     # constructor
-    def __init__(self, dir_path, pattern, sheet='Statistics', skiprows=7,save=True):
+    def __init__(self, dir_path, pattern, sheet='Statistics', skiprows=7,save=True,
+                 incremental=False):
         """
         Constructor
         @param dir_path: The path where to search for the files
         @param pattern: The pattern of the xlsx files to be read
         @param sheet: The sheet to be read
         @param skiprows: rows to skip from the excel file
+        @param incremental: True to parse only the files that changed since
+        the last save, see update_dataframe
         @return: A Pandas DataFrame object with the hourly consumption
         """
 
-        # check if there is a saved data frame with the values
-        if os.path.isfile(os.path.join(dir_path, 'mconsum')):
-            self.df = pd.read_pickle(os.path.join(dir_path, 'mconsum'))
-        else:
+        # check if there is a saved data frame from the same files
+        key = cache.cache_key(glob.glob(dir_path + pattern), sheet=sheet,
+                              skiprows=skiprows, version=FORMAT_VERSION)
+        self.df = cache.load(dir_path, 'mconsum', key)
+        if self.df is None and incremental:
+            self.update_dataframe(dir_path, pattern, sheet, skiprows, save=save)
+        elif self.df is None:
             self.load_dataframe(dir_path, pattern, sheet, skiprows, save=save)
 
     # load data frame from files
+    @instrumentation.instrumented
     def load_dataframe(self, dir_path, pattern, sheet='Statistics',
                        skiprows=7, save=True):
         """
@@ -62,36 +157,72 @@ class MonthlyPowerConsumptions(object):
         for all countries and all dates
         """
 
-        global year
         print('_' * 80)
 
-        # create a DataFrame
-        self.df = pd.DataFrame()
-
         # search for the files to load
-        for file_name in glob.glob(dir_path + pattern):
+        file_names = glob.glob(dir_path + pattern)
+        frames = dict((file_name, read_monthly_file(file_name, sheet, skiprows))
+                      for file_name in file_names)
+
+        self._join_files(file_names, frames)
+
+        # save the data frame for latter use, to avoid reading all files again
+        if save:
+            self._save(dir_path, file_names, frames, sheet, skiprows)
+
+        return self.df
+
+    @instrumentation.instrumented
+    def update_dataframe(self, dir_path, pattern, sheet='Statistics',
+                         skiprows=7, save=True):
+        """
+        This function refreshes the data frame parsing only the files that
+        are new or changed since the last time they were saved. The rows of
+        a changed file replace the rows it had before and the rows of a file
+        that is not found anymore are removed. Same parameters and result
+        than load_dataframe
+        @return: A Pandas DataFrame object with the monthly consumption
+        for all countries and all dates
+        """
+
+        print('_' * 80)
 
-            print file_name
+        # per file data frames saved on the last load or update
+        key = cache.cache_key([], sheet=sheet, skiprows=skiprows,
+                              version=FORMAT_VERSION)
+        parts = cache.load(dir_path, 'mconsum.parts', key) or {}
 
-            # read excel file first only to get the year
-            wb = pd.read_excel(file_name, sheet)
-            # get year
-            if wb.iloc[1, 0] == "Year:":
-                year = wb.iloc[1, 1]
+        # parse only the new and changed files
+        file_names = glob.glob(dir_path + pattern)
+        frames = dict((file_name, entry['df'])
+                      for file_name, entry in parts.items())
+        for file_name in cache.changed_files(parts, file_names):
+            frames[file_name] = read_monthly_file(file_name, sheet, skiprows)
 
-            # read excel file this time to get the right format skipping rows
-            wb = pd.read_excel(file_name, sheet, skiprows=skiprows,
-                               na_values=[u'n.a.'], keep_default_na=False)
+        self._join_files(file_names, frames)
 
+        if save:
+            self._save(dir_path, file_names, frames, sheet, skiprows)
 
-            # add year to data frame
-            wb['year'] = year
+        return self.df
 
-            # Append to the self.df data frame
-            self.df = self.df.append(wb)
+    def _join_files(self, file_names, frames):
+        """
+        Build the data frame from the data frames parsed from each file
+        """
+
+        # create a DataFrame
+        if file_names:
+            self.df = pd.concat([frames[file_name] for file_name in file_names])
+        else:
+            self.df = pd.DataFrame(columns=['Country', 'year'])
+
+        # files without year keep the year from the previous file
+        self.df['year'] = self.df['year'].ffill()
 
         # change monthly consumptions data type to float
-        self.df.iloc[:, 1:14] = self.df.iloc[:, 1:14].astype(float)
+        columns = self.df.columns[1:14]
+        self.df[columns] = self.df[columns].astype(float)
 
         #monthDict={'1':'Jan', '2':'Feb', '3':'Mar', '4':'Apr', '5':'May', '6':'Jun', '7':'Jul', '8':'Aug', '9':'Sep', '10':'Oct', '11':'Nov', '12':'Dec'}
         ## change columns names if they are months for a meanfull name
@@ -99,23 +230,95 @@ class MonthlyPowerConsumptions(object):
         # rename Country to country
         self.df = self.df.rename(columns=lambda x: re.sub('Country', 'country', str(x)))
 
-        # save the data frame for latter use, to avoid reading all files again
-        if save:
-            self.df.to_pickle(os.path.join(dir_path, 'mconsum'))
+        # long format view used by the monthly analytics
+        self.get_monthly_series()
 
-    def arrange_months_names(self):
+    def _save(self, dir_path, file_names, frames, sheet, skiprows):
+        """
+        Save the data frame and the per file data frames used by
+        update_dataframe
+        """
+        key = cache.cache_key(file_names, sheet=sheet, skiprows=skiprows,
+                              version=FORMAT_VERSION)
+        cache.save(dir_path, 'mconsum', key, self.df)
+
+        key = cache.cache_key([], sheet=sheet, skiprows=skiprows,
+                              version=FORMAT_VERSION)
+        cache.save(dir_path, 'mconsum.parts', key,
+                   cache.make_parts(file_names, frames))
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Build an object that answers the queries reading only the needed
+        partitions from a columnar store instead of keeping all the data
+        in memory
+        @param store: store.ColumnarStore partitioned by country (and year),
+        see save_to_store
+        @return: MonthlyPowerConsumptions object without the df in memory
+        """
+        mpc = cls.__new__(cls)
+        mpc.df = None
+        mpc.store = store
+        return mpc
+
+    def save_to_store(self, store):
+        """
+        This function saves the data frame on a columnar store, replacing
+        the data that it had
+        @param store: store.ColumnarStore partitioned by country (and year)
+        @return: n/a
+        """
+        store.clear()
+        store.write(self.df)
+
+    def get_monthly_series(self, country_list=None):
+        """
+        This function gets the monthly consumptions in long format, see
+        long_monthly. It is built once when the data frame changes and the
+        queries select from it without copying the data frame
+        @param country_list: list of countries to select or None for all of them
+        @return: data frame with the country, year, month and value columns
+        """
+        if self.store is not None:
+            filters = {}
+            if country_list is not None:
+                filters['country'] = country_list
+            return long_monthly(self.store.read(filters))
+
+        if self._series is None or self._series_df is not self.df:
+            self._series = long_monthly(self.df)
+            self._series_df = self.df
+
+        if country_list is None:
+            return self._series
+        return self._series[self._series['country'].isin(country_list)]
+
+    @instrumentation.instrumented
+    def arrange_months_names(self, country_list=None):
         """
         This function changes the columns names to month names instead of numbers
-        @param n/a
+        @param country_list: list of countries to select or None for all of them
         @return: data frame with the df with the new columns names
         """
-        df = self.df.copy(deep=True)
+        if self.store is not None:
+            filters = {}
+            if country_list is not None:
+                filters['country'] = country_list
+            df = self.store.read(filters)
+        elif country_list is not None:
+            # Select values only for these countries, only their rows are
+            # copied
+            df = self.df[self.df.country.isin(country_list)]
+        else:
+            df = self.df
 
-        monthDict={'1':'Jan', '2':'Feb', '3':'Mar', '4':'Apr', '5':'May', '6':'Jun', '7':'Jul', '8':'Aug', '9':'Sep', '10':'Oct', '11':'Nov', '12':'Dec'}
-        df = df.rename(columns=monthDict)
+        # rename returns a new data frame, self.df is not changed
+        df = df.rename(columns=dict(zip(MONTH_COLUMNS, MONTHS)))
 
         return df
 
+    @instrumentation.instrumented
     def normalized_monthly_country_data(self, country):
 
         """
@@ -125,21 +328,31 @@ class MonthlyPowerConsumptions(object):
         @param country: Country to select
         @return: data frame with the country normalized monthly consumptions
         """
-        df = self.arrange_months_names()
+        return self.normalized_monthly_countries_data([country])
 
-        # Select values only for this country
-        df = df[df.country == country]
-
-        # Set index to make computations easier
-        df = df.set_index(['country', 'year'])
+    @instrumentation.instrumented
+    def normalized_monthly_countries_data(self, country_list=None,
+                                          workers=1):
+        """
+        This function normalizes the monthly consumptions of several
+        countries based on the yearly consumption, selecting all of them at
+        once
+        @param country_list: list of countries to select or None for all of
+        them
+        @param workers: number of processes, see parallel.apply_by_group
+        @return: data frame indexed by (country, year) with the normalized
+        monthly consumptions of all the countries
+        """
+        # Select values only for these countries
+        df = self.arrange_months_names(country_list)
 
-        # Do normalization based on the yearly consumption
-        yearly_consumption = df.sum(axis=1)
-        df = df.div(yearly_consumption, axis='index')
+        df = parallel.apply_by_group(normalize_monthly, df, 'country',
+                                     workers)
 
         # return the dataframe
-        return df
+        return df.sort_index()
 
+    @instrumentation.instrumented
     def get_yearly_consumption_countries(self, country_list, normalized=False, year=""):
         """
         This function gets the yearly consumption from the list of countries given
@@ -164,6 +377,7 @@ class MonthlyPowerConsumptions(object):
 
         return df
 
+    @instrumentation.instrumented
     def select_country_data(self, country):
 
         """
@@ -171,29 +385,29 @@ class MonthlyPowerConsumptions(object):
         @param country: Country to select
         @return: data frame with the country data
         """
-        df = self.arrange_months_names()
-
         # Select values only for this country
-        df = df[df.country == country]
+        df = self.arrange_months_names([country])
 
         # return the dataframe
         return df
 
+    @instrumentation.instrumented
     def select_countries_data(self, country_list):
         """
         This function selects the monthly data from several countries
         @param country_list: A list of countries for example ['ES','PT']
         @return: data frame with the countries data
         """
-        df = self.arrange_months_names()
-
         if country_list != '':
             # Select values only for this country
-            df = df[df.country.isin(country_list)]
+            df = self.arrange_months_names(country_list)
+        else:
+            df = self.arrange_months_names()
 
         # return the dataframe
         return df
 
+    @instrumentation.instrumented
     def transform_monthly_data(self):
         """
         This function arranges the monthly data for processing
@@ -201,19 +415,18 @@ class MonthlyPowerConsumptions(object):
         @return: data frame with the arrange monthly data
         """
 
-        df = self.arrange_months_names()
+        df = self.get_monthly_series()
 
-        # Take out the sum of the year
-        del df['Sum']
-        df = df.set_index(['year', 'country'])
-        df = df.T
-        df = df.unstack()
-        df.index.names = ['year', 'country', 'month']
-        df = pd.DataFrame(df, columns=['avg-demand'])
+        index = pd.MultiIndex.from_arrays(
+            [df['year'].values, df['country'].astype(str).values,
+             np.array(MONTHS, dtype=object)[df['month'].values - 1]],
+            names=['year', 'country', 'month'])
+        df = pd.DataFrame({'avg-demand': df['value'].values}, index=index)
 
         # return the dataframe
         return df
 
+    @instrumentation.instrumented
     def data_normalization(self, year=True, how='mean', country_list=''):
         """
         This function normalized the data based on the "how" given
@@ -235,17 +448,17 @@ class MonthlyPowerConsumptions(object):
                 df = df_year
 
             else:
-                # Normalize monthly data base on the yearly sum
-                df_month = df.copy()
-                df_month.loc[:,"Jan":"Dec"] = df_month.loc[:,"Jan":"Dec"].div(df_month['Sum'], axis=0)
-                df = df_month
+                # Normalize monthly data base on the yearly sum, df is
+                # already a new data frame
+                df[MONTHS] = df[MONTHS].div(df['Sum'], axis=0)
 
         else:
-            print "WARNING: Don't know how to do this normalization... returning the dataframe as it is...\n"
+            print("WARNING: Don't know how to do this normalization... returning the dataframe as it is...\n")
 
         # return the dataframe
         return df
 
+    @instrumentation.instrumented
     def get_monthly_consumption_countries(self, country_list, normalized=False):
 
         """
@@ -264,6 +477,7 @@ class MonthlyPowerConsumptions(object):
 
         return df
 
+    @instrumentation.instrumented
     def get_average_monthly_data(self, year=''):
         """
         This function computes average monthly values
@@ -271,17 +485,20 @@ class MonthlyPowerConsumptions(object):
         @return: data frame with the average monthly data per country
         """
 
-        df = self.transform_monthly_data()
+        df = self.get_monthly_series()
 
-        # arrange index only for year
-        df = df.reset_index()
-        df = df.set_index('year')
         # Select the minimum year for the average
         if year != "":
-            df = df[df.index>= year]
+            df = df[df['year'] >= year]
 
         # Compute monthly average per country
-        df = df.groupby(by=['country','month']).mean()
-
-        # return the dataframe
-        return df
+        means = df.groupby(['country', 'month'], observed=True)['value'].mean()
+        index = pd.MultiIndex.from_arrays(
+            [means.index.get_level_values('country').astype(str),
+             np.array(MONTHS, dtype=object)[
+                 means.index.get_level_values('month') - 1]],
+            names=['country', 'month'])
+        df = pd.DataFrame({'avg-demand': means.values}, index=index)
+
+        # return the dataframe, sorted as the months names
+        return df.sort_index()
@@ -0,0 +1,180 @@
+"""
+This module provides a country-year panel that joins the yearly power
+consumption with the indicators from eurostats (GDP, population,
+inflation,...), so the queries that relate them are index lookups
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+
+# country codes of eurostats that are different on https://www.entsoe.eu/
+COUNTRY_ALIASES = {'UK': 'GB', 'EL': 'GR'}
+
+# GWh to kWh, for the consumption per capita
+GWH_TO_KWH = 1e6
+
+
+def fingerprint(df):
+    """
+    This function computes a fingerprint of a data frame that changes when
+    its index or its values change
+    @param df: data frame or None
+    @return: tuple with the shape and a hash of the data frame, None if
+    there is no data frame
+    """
+    if df is None:
+        return None
+    return (df.shape, int(pd.util.hash_pandas_object(df, index=True).sum()))
+
+
+def indicator_series(df, name):
+    """
+    This function converts an indicator (year x country data frame, see
+    eurostat.EurostatIndicator) to a series indexed by (country, year)
+    @param df: data frame indexed by year with a column per country
+    @param name: name of the series
+    @return: series indexed by (country, year) without the missing values
+    """
+    # only the yearly values, Ex: not '2014M01'
+    df = df[[isinstance(year, int) for year in df.index]]
+    df = df.rename(columns=lambda country: COUNTRY_ALIASES.get(country,
+                                                               country))
+    series = df.T.stack()
+    series.index.names = ['country', 'year']
+    series.name = name
+    return series.dropna().astype('float64')
+
+
+def consumption_series(mpc):
+    """
+    This function gets the yearly consumption of all the countries
+    @param mpc: MonthlyPowerConsumptions object
+    @return: series indexed by (country, year) with the yearly consumption
+    """
+    df = mpc.select_countries_data('')
+    df = df[df['year'].notnull()]
+    series = pd.Series(df['Sum'].astype('float64').values,
+                       index=pd.MultiIndex.from_arrays(
+                           [df['country'].astype(str).values,
+                            df['year'].astype(int).values],
+                           names=['country', 'year']),
+                       name='consumption')
+    # a country and year that appears twice keeps the last file
+    return series[~series.index.duplicated(keep='last')].dropna()
+
+
+class CountryYearPanel(object):
+    """
+        This class contains a data frame indexed by (country, year) with the
+        yearly consumption, the indicators and the intensity columns:
+        consumption_per_capita (kWh per inhabitant) and consumption_per_gdp
+    """
+
+    # constructor
+    def __init__(self, mpc, gdp=None, population=None, inflation=None,
+                 **indicators):
+        """
+        Constructor
+        @param mpc: MonthlyPowerConsumptions object
+        @param gdp: GDP object or None, consumption_per_gdp is only
+        meaningful when it is a level and not a growth rate
+        @param population: Population object or None
+        @param inflation: Inflation object or None
+        @param indicators: more eurostat.EurostatIndicator objects, the
+        names are the names of the columns. Ex: unemployment=un
+        @return: CountryYearPanel object with the panel on self.df
+        """
+        self.sources = {'consumption': mpc}
+        for name, source in [('gdp', gdp), ('population', population),
+                             ('inflation', inflation)]:
+            if source is not None:
+                self.sources[name] = source
+        self.sources.update(indicators)
+
+        self.df = None
+        self._fingerprints = {}
+        self._series = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        This function updates the panel with the sources that changed since
+        the last refresh, the columns of the other sources are not computed
+        again
+        @return: list with the names of the sources that changed
+        """
+        changed = []
+        for name, source in self.sources.items():
+            current = fingerprint(source.df)
+            # a source without data frame in memory (Ex: using a store)
+            # is always read again
+            if current is not None and \
+                    self._fingerprints.get(name) == current and \
+                    name in self._series:
+                continue
+
+            if name == 'consumption':
+                self._series[name] = consumption_series(source)
+            else:
+                self._series[name] = indicator_series(source.df, name)
+            self._fingerprints[name] = current
+            changed.append(name)
+
+        if changed or self.df is None:
+            self._join()
+
+        return changed
+
+    def _join(self):
+        """
+        Align all the series on the same (country, year) index and add the
+        intensity columns
+        """
+        columns = ['consumption'] + sorted(name for name in self._series
+                                           if name != 'consumption')
+        df = pd.concat([self._series[name] for name in columns], axis=1)
+        df = df.reindex(columns=columns).sort_index()
+
+        if 'population' in df:
+            df['consumption_per_capita'] = (df['consumption'] * GWH_TO_KWH /
+                                            df['population'])
+        if 'gdp' in df:
+            df['consumption_per_gdp'] = df['consumption'] / df['gdp']
+
+        self.df = df
+
+    def select(self, country_list=None, years=None, columns=None):
+        """
+        This function selects some rows and columns of the panel
+        @param country_list: list of countries or None for all of them
+        @param years: list of years or None for all of them
+        @param columns: list of columns or None for all of them
+        @return: data frame indexed by (country, year)
+        """
+        mask = pd.Series(True, index=self.df.index)
+        if country_list is not None:
+            mask &= self.df.index.get_level_values('country').isin(
+                country_list)
+        if years is not None:
+            mask &= self.df.index.get_level_values('year').isin(years)
+
+        df = self.df[mask.values]
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    def get_country_data(self, country, columns=None):
+        """
+        This function gets the panel of a country, Ex: its consumption and
+        inflation per year
+        @param country: country to select. Ex: 'ES'
+        @param columns: list of columns or None for all of them
+        @return: data frame indexed by year
+        """
+        df = self.df.xs(country, level='country')
+        if columns is not None:
+            df = df[list(columns)]
+        return df
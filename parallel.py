@@ -0,0 +1,45 @@
+"""
+This module provides a function to apply a computation to the rows of each
+country of a data frame, in several processes when the data is large
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# parallel computation
+import multiprocessing
+
+
+def apply_by_group(function, df, column, workers=1):
+    """
+    This function applies a function to the rows of each value of a column
+    and joins the results. With workers > 1 the groups are split in chunks
+    that are computed by a pool of processes, the function has to be defined
+    at module level so it can be sent to them
+    @param function: function that gets a data frame and returns a data
+    frame, it must not depend on rows of other groups
+    @param df: data frame to compute
+    @param column: column with the groups. Ex: 'Country'
+    @param workers: number of processes, 1 to compute everything in this
+    process with a single call
+    @return: data frame with the results of all the groups
+    """
+    groups = pd.unique(df[column].astype(str))
+    if workers <= 1 or len(groups) <= 1:
+        return function(df)
+
+    # one chunk per process, each with whole groups
+    workers = min(workers, len(groups))
+    chunks = [df[df[column].astype(str).isin(groups[i::workers])]
+              for i in range(workers)]
+
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        results = pool.map(function, chunks)
+    finally:
+        pool.close()
+        pool.join()
+
+    return pd.concat(results)
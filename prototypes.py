@@ -0,0 +1,219 @@
+"""
+This module provides running aggregates of the hourly consumptions per
+country, weekday and hour, so the average days and the prototypes of the
+weekdays are updated with the new days only instead of being computed again
+from all the data. The plain means are kept as a weekday rollup (see
+hourlypowerconsumptions.rollup), the same sums and counts the queries use.
+Optionally it also keeps exponentially weighted means, where the newest days
+of each weekday weight more
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# rollups of the hourly consumptions and the prototypes computation
+from hourlypowerconsumptions import HOURS, rollup, combine_rollups, \
+    rollup_means, weekday_prototype
+
+
+class PrototypeAccumulator(object):
+    """
+        This class contains the rollup per (Country, year, weekday) of all
+        the days added and, optionally, the exponentially weighted sums per
+        (country, weekday, hour)
+    """
+
+    # constructor
+    def __init__(self, alpha=None):
+        """
+        Constructor
+        @param alpha: smoothing factor (0, 1] of the exponentially weighted
+        means, the weight of a day of a weekday is (1 - alpha) ** n where n
+        is the number of days of the same weekday added after it. None to
+        keep only the plain means
+        @return: PrototypeAccumulator object without days
+        """
+        if alpha is not None and not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]: " + str(alpha))
+        self.alpha = alpha
+
+        # sums and counts per (Country, year, weekday), see rollup
+        self.table = None
+
+        if alpha is not None:
+            self.countries = []
+            self._positions = {}
+            self.weighted_sums = np.zeros((0, 7, 24))
+            self.weights = np.zeros((0, 7, 24))
+            self.weighted_daily_sums = np.zeros((0, 7))
+            self.daily_weights = np.zeros((0, 7))
+
+    def update(self, df):
+        """
+        This function adds new days, it only goes through their rows. The
+        exponentially weighted means expect the days to be added in date
+        order, the days of a call are sorted by date
+        @param df: hourly data frame with the new days (Country, H01,...,H24,
+        date, weekday, year, daily), Ex: the data frame of
+        hourlypowerconsumptions.read_hourly_file
+        @return: n/a
+        """
+        if len(df) == 0:
+            return
+        self._add_rollup(rollup(df, 'weekday'))
+        if self.alpha is not None:
+            self._update_weighted(df)
+
+    def add_parts(self, parts):
+        """
+        This function adds the files parsed by HourlyPowerConsumptions, their
+        weekday rollups are used as they are
+        @param parts: list of dictionaries with the 'df' and the 'rollups' of
+        each file, see HourlyPowerConsumptions._parse_files
+        @return: n/a
+        """
+        parts = [part for part in parts if len(part['df'])]
+        if not parts:
+            return
+        self._add_rollup(combine_rollups([part['rollups']['weekday']
+                                          for part in parts]))
+        if self.alpha is not None:
+            self._update_weighted(pd.concat([part['df'] for part in parts]))
+
+    def _add_rollup(self, table):
+        """
+        Add the sums and counts of a weekday rollup
+        """
+        if self.table is None:
+            self.table = table
+        else:
+            self.table = combine_rollups([self.table, table])
+
+    def _rows(self, countries):
+        """
+        Positions of the countries on the weighted arrays, the new countries
+        are added
+        """
+        names, inverse = np.unique(countries, return_inverse=True)
+        new = [name for name in names if name not in self._positions]
+        if new:
+            for name in new:
+                self._positions[name] = len(self.countries)
+                self.countries.append(name)
+            for attr in ['weighted_sums', 'weights', 'weighted_daily_sums',
+                         'daily_weights']:
+                values = getattr(self, attr)
+                zeros = np.zeros((len(new),) + values.shape[1:])
+                setattr(self, attr, np.concatenate([values, zeros]))
+
+        positions = np.array([self._positions[name] for name in names],
+                             dtype=int)
+        return positions[inverse.ravel()]
+
+    def _update_weighted(self, df):
+        """
+        Update the exponentially weighted sums: the sums before the update
+        decay by the number of new days of each (country, weekday) and each
+        new day weights by the number of new days after it
+        """
+        rows = self._rows(df['Country'].astype(str).to_numpy(object))
+        weekdays = df['weekday'].to_numpy('int64')
+        values = df[HOURS].to_numpy('float64')
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0)
+        daily = df['daily'].to_numpy('float64')
+        daily_present = ~np.isnan(daily)
+        daily = np.where(daily_present, daily, 0)
+
+        groups = rows * 7 + weekdays
+        order = np.lexsort((df['date'].values, groups))
+        sorted_groups = groups[order]
+
+        # number of days of the same group after each day
+        first = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+        starts = np.flatnonzero(first)
+        sizes = np.diff(np.r_[starts, len(order)])
+        after = np.empty(len(order), dtype='int64')
+        after[order] = np.repeat(starts + sizes, sizes) - np.arange(
+            len(order)) - 1
+
+        decay = 1 - self.alpha
+        group_rows = sorted_groups[starts] // 7
+        group_weekdays = sorted_groups[starts] % 7
+        factors = decay ** sizes
+        for attr in ['weighted_sums', 'weights']:
+            getattr(self, attr)[group_rows, group_weekdays] *= \
+                factors[:, np.newaxis]
+        for attr in ['weighted_daily_sums', 'daily_weights']:
+            getattr(self, attr)[group_rows, group_weekdays] *= factors
+
+        weights = decay ** after
+        np.add.at(self.weighted_sums, (rows, weekdays),
+                  values * weights[:, np.newaxis])
+        np.add.at(self.weights, (rows, weekdays),
+                  present * weights[:, np.newaxis])
+        np.add.at(self.weighted_daily_sums, (rows, weekdays), daily * weights)
+        np.add.at(self.daily_weights, (rows, weekdays),
+                  daily_present * weights)
+
+    def means(self, country_list=None, years=None, weighted=False):
+        """
+        This function gets the average consumption per country, weekday and
+        hour of the days added, the same as
+        HourlyPowerConsumptions.get_daily_aggregates_countries
+        @param country_list: list of countries or None for all of them
+        @param years: list of years or None for all of them, only for the
+        plain means
+        @param weighted: True for the exponentially weighted means of all
+        the years
+        @return: data frame (Country, weekday, H01,...,H24, daily), sorted by
+        country and weekday
+        """
+        if not weighted:
+            if self.table is None:
+                return pd.DataFrame(columns=['Country', 'weekday'] + HOURS +
+                                    ['daily'])
+            return rollup_means(self.table, country_list, years)
+
+        if self.alpha is None:
+            raise ValueError("The accumulator has no weighted means")
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.weighted_sums / self.weights
+            daily = self.weighted_daily_sums / self.daily_weights
+
+        countries = sorted(country for country in self.countries
+                           if country_list is None or country in country_list)
+        positions = np.array([self._positions[country]
+                              for country in countries], dtype=int)
+
+        # only the (country, weekday) pairs with days, as a groupby gives
+        rows = self.daily_weights[positions] > 0
+        country_pos, weekday = np.nonzero(rows)
+
+        df = pd.DataFrame(means[positions][rows], columns=HOURS)
+        df.insert(0, 'weekday', weekday)
+        df.insert(0, 'Country', [countries[pos] for pos in country_pos])
+        df['daily'] = daily[positions][rows]
+
+        return df
+
+    def prototype(self, weekday, country_list=None, years=None,
+                  weighted=False):
+        """
+        This function gets the prototype hourly consumption of a weekday, the
+        same as HourlyPowerConsumptions.get_hourly_prototype_weekday_countries
+        @param weekday: day of the week. Ex: 'Monday', 'Tuesday', 'Working' (Monday to Friday), 'Weekend'
+        @param country_list: list of countries or None for all of them
+        @param years: list of years or None for all of them, only for the
+        plain prototype
+        @param weighted: True for the exponentially weighted prototype
+        @return: data frame indexed by hour ('1',...,'24') with a column per
+        country
+        """
+        return weekday_prototype(self.means(country_list, years, weighted),
+                                 weekday)
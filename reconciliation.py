@@ -0,0 +1,133 @@
+"""
+This module provides the cross-check of the hourly and the monthly
+consumptions from https://www.entsoe.eu/: the hourly data is added up by
+country, year and month and compared with the monthly data of all the
+countries at once
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# columns with the hourly consumptions
+from hourlypowerconsumptions import DST_HOUR
+
+# status of each country, year and month
+STATUS_OK = 'ok'
+STATUS_MISMATCH = 'mismatch'
+STATUS_INCOMPLETE = 'incomplete'
+STATUS_MISSING_HOURLY = 'missing_hourly'
+STATUS_MISSING_MONTHLY = 'missing_monthly'
+
+# columns of the reconciliation report
+REPORT_COLUMNS = ['hourly', 'monthly', 'difference', 'relative_difference',
+                  'days', 'days_in_month', 'status']
+
+
+def hourly_monthly_totals(hpc, country_list=None, years=None):
+    """
+    This function adds up the hourly consumptions by country, year and month,
+    the extra hour of the day the clock goes back included
+    @param hpc: HourlyPowerConsumptions object
+    @param country_list: list of countries or None for all of them
+    @param years: list of years or None for all of them
+    @return: data frame indexed by (country, year, month) with the total
+    consumption and the number of days with data
+    """
+    columns = ['Country', 'year', 'month', 'daily']
+    if hpc.store is not None or DST_HOUR in hpc.df.columns:
+        columns.append(DST_HOUR)
+    df = hpc._select(country_list, years, columns)
+
+    total = df['daily'].astype('float64')
+    if DST_HOUR in df.columns:
+        total = total + df[DST_HOUR].astype('float64').fillna(0)
+
+    keys = [df['Country'].astype(str).values, df['year'].astype(int).values,
+            df['month'].astype(int).values]
+    totals = pd.DataFrame({'hourly': total.values, 'days': 1}).groupby(
+        keys).sum()
+    totals.index.names = ['country', 'year', 'month']
+    return totals
+
+
+def monthly_totals(mpc, country_list=None, years=None):
+    """
+    This function gets the monthly consumptions in long format
+    @param mpc: MonthlyPowerConsumptions object
+    @param country_list: list of countries or None for all of them
+    @param years: list of years or None for all of them
+    @return: series indexed by (country, year, month) with the monthly
+    consumption
+    """
+    df = mpc.get_monthly_series(country_list)
+    if years is not None:
+        df = df[df['year'].isin(years)]
+
+    index = pd.MultiIndex.from_arrays(
+        [df['country'].astype(str).values, df['year'].astype(int).values,
+         df['month'].astype(int).values],
+        names=['country', 'year', 'month'])
+    series = pd.Series(df['value'].values, index=index, name='monthly')
+
+    # a country and year that appears twice keeps the last file
+    return series[~series.index.duplicated(keep='last')]
+
+
+def reconcile(hpc, mpc, scale=0.001, threshold=0.05, country_list=None,
+              years=None):
+    """
+    This function compares the hourly and the monthly consumptions of all
+    the countries, years and months at once
+    @param hpc: HourlyPowerConsumptions object
+    @param mpc: MonthlyPowerConsumptions object
+    @param scale: factor from the hourly to the monthly units. Ex: 0.001
+    from MWh to GWh
+    @param threshold: relative difference over which a month is a mismatch.
+    Ex: 0.05 for 5%
+    @param country_list: list of countries or None for all of them
+    @param years: list of years or None for all of them
+    @return: data frame indexed by (country, year, month) with the hourly and
+    the monthly totals, the differences, the days with hourly data and the
+    status of each month: 'ok', 'mismatch', 'incomplete' (not all the days
+    have hourly data), 'missing_hourly' or 'missing_monthly'
+    """
+    hourly = hourly_monthly_totals(hpc, country_list, years)
+    monthly = monthly_totals(mpc, country_list, years)
+
+    # only the years with hourly data are compared
+    monthly = monthly[monthly.index.get_level_values('year').isin(
+        hourly.index.get_level_values('year').unique())]
+
+    df = hourly.join(monthly, how='outer')
+    df['hourly'] = df['hourly'] * scale
+    df['difference'] = df['hourly'] - df['monthly']
+    df['relative_difference'] = df['difference'] / df['monthly'].abs()
+
+    first_days = pd.to_datetime(pd.DataFrame({
+        'year': df.index.get_level_values('year'),
+        'month': df.index.get_level_values('month'), 'day': 1}))
+    df['days_in_month'] = first_days.dt.days_in_month.values
+
+    status = np.where(df['relative_difference'].abs() > threshold,
+                      STATUS_MISMATCH, STATUS_OK).astype(object)
+    status[(df['days'] < df['days_in_month']).values] = STATUS_INCOMPLETE
+    status[df['monthly'].isnull().values] = STATUS_MISSING_MONTHLY
+    status[df['hourly'].isnull().values] = STATUS_MISSING_HOURLY
+    df['status'] = status
+    df['days'] = df['days'].fillna(0).astype(int)
+
+    return df[REPORT_COLUMNS].sort_index()
+
+
+def summary(report):
+    """
+    This function counts the months of each status per country
+    @param report: data frame built by reconcile
+    @return: data frame country x status with the number of months
+    """
+    return report.groupby([report.index.get_level_values('country'),
+                           'status']).size().unstack(fill_value=0)
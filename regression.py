@@ -0,0 +1,152 @@
+"""
+This module provides the relation between the yearly consumption and the
+indicators from eurostats (GDP, population, inflation,...) for all the
+countries at once. The year x country matrices are aligned and the
+correlations, the least squares fits and the elasticities of every country
+are computed with the same array operations, without a loop per country
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# country codes of eurostats that are different on https://www.entsoe.eu/
+from panel import COUNTRY_ALIASES
+
+# columns of the fits, one row per country
+FIT_COLUMNS = ['n', 'correlation', 'slope', 'intercept', 'r2', 'stderr']
+
+
+def _years(index):
+    """
+    Years of an index as integers when they are numbers. Ex: 2011.0
+    """
+    try:
+        return pd.Index(index).astype(float).astype(int)
+    except (TypeError, ValueError):
+        return pd.Index(index)
+
+
+def align(y, x):
+    """
+    This function aligns two year x country data frames on their common
+    years and countries
+    @param y: data frame indexed by year with a column per country. Ex:
+    MonthlyPowerConsumptions.get_yearly_consumption_countries
+    @param x: data frame indexed by year with a column per country. Ex:
+    GDP.select_countries_data
+    @return: tuple with (y, x) as float64 data frames with the same index
+    and columns
+    """
+    y = y.copy()
+    x = x.rename(columns=lambda country: COUNTRY_ALIASES.get(country,
+                                                             country))
+    y.index = _years(y.index)
+    x.index = _years(x.index)
+
+    years = y.index.intersection(x.index).sort_values()
+    countries = [country for country in y.columns if country in x.columns]
+
+    return (y.loc[years, countries].astype('float64'),
+            x.loc[years, countries].astype('float64'))
+
+
+def batch_fit(y, x):
+    """
+    This function fits y = intercept + slope * x by least squares for each
+    country (column) at once, using only the years where both have values
+    @param y: year x country data frame with the dependent values
+    @param x: year x country data frame with the explanatory values
+    @return: data frame indexed by country with the number of years, the
+    correlation, the slope, the intercept, the r2 and the standard error of
+    the slope
+    """
+    y, x = align(y, x)
+    Y = y.values
+    X = x.values
+
+    present = ~np.isnan(Y) & ~np.isnan(X)
+    n = present.sum(axis=0).astype('float64')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.where(present, X, 0).sum(axis=0) / n
+        mean_y = np.where(present, Y, 0).sum(axis=0) / n
+
+        dx = np.where(present, X - mean_x, 0)
+        dy = np.where(present, Y - mean_y, 0)
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+        correlation = sxy / np.sqrt(sxx * syy)
+        residuals = np.maximum(syy - slope * sxy, 0)
+        stderr = np.sqrt(residuals / (n - 2) / sxx)
+
+    stderr[n <= 2] = np.nan
+
+    df = pd.DataFrame({'n': n.astype(int), 'correlation': correlation,
+                       'slope': slope, 'intercept': intercept,
+                       'r2': correlation ** 2, 'stderr': stderr},
+                      index=y.columns, columns=FIT_COLUMNS)
+    df.index.name = 'country'
+    return df
+
+
+def batch_elasticity(y, x):
+    """
+    This function computes the elasticity of y to x of each country as the
+    slope of the fit of log(y) on log(x). Only the positive values are used
+    @param y: year x country data frame with the dependent values
+    @param x: year x country data frame with the explanatory values
+    @return: data frame indexed by country as batch_fit, the slope is the
+    elasticity
+    """
+    y, x = align(y, x)
+    return batch_fit(np.log(y.where(y > 0)), np.log(x.where(x > 0)))
+
+
+def batch_correlations(y, indicators):
+    """
+    This function computes the correlation of y with several indicators for
+    all the countries
+    @param y: year x country data frame. Ex: the yearly consumption
+    @param indicators: dictionary name -> year x country data frame
+    @return: data frame country x indicator with the correlations
+    """
+    return pd.DataFrame(dict((name, batch_fit(y, x)['correlation'])
+                             for name, x in indicators.items()))
+
+
+def demand_drivers(mpc, indicators, country_list, year=""):
+    """
+    This function relates the yearly consumption of some countries with
+    several indicators
+    @param mpc: MonthlyPowerConsumptions object
+    @param indicators: dictionary name -> eurostat.EurostatIndicator. Ex:
+    {'gdp': gdp, 'population': pop, 'inflation': inflation}
+    @param country_list: list of countries. Ex: ['ES', 'PT']
+    @param year: first year to use or "" for all of them
+    @return: data frame indexed by (indicator, country) with the fit (see
+    batch_fit) and an 'elasticity' column
+    """
+    y = mpc.get_yearly_consumption_countries(country_list, year=year)
+
+    fits = []
+    for name in sorted(indicators):
+        # the indicators use the eurostats codes. Ex: UK for GB
+        codes = dict((COUNTRY_ALIASES.get(code, code), code)
+                     for code in indicators[name].df.columns)
+        x = indicators[name].select_countries_data(
+            [codes[country] for country in country_list if country in codes])
+
+        fit = batch_fit(y, x)
+        fit['elasticity'] = batch_elasticity(y, x)['slope']
+        fits.append(fit)
+
+    return pd.concat(fits, keys=sorted(indicators),
+                     names=['indicator', 'country'])
@@ -0,0 +1,145 @@
+"""
+This module provides a columnar on disk store for the consumption data frames,
+partitioned by the values of some columns (Ex: country and year) so a query
+only reads the files and the columns that it needs
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+# pathname pattern expansion
+import glob
+import os
+import shutil
+
+
+class ColumnarStore(object):
+    """
+        This class contains all the structures and functions to save a data
+        frame as Parquet (or Feather) files, one directory per partition:
+        root/Country=ES/year=2012/part.parquet
+    """
+    FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+    # constructor
+    def __init__(self, root, partition_cols=('Country', 'year'),
+                 fmt='parquet'):
+        """
+        Constructor
+        @param root: The path of the store
+        @param partition_cols: columns used to split the data in directories.
+        Ex: ('Country', 'year') for hourly data, ('country',) for monthly data
+        @param fmt: 'parquet' or 'feather', both need the pyarrow package.
+        Feather files do not keep the index of the data frame
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError("Unknown store format: " + str(fmt))
+
+        self.root = root
+        self.partition_cols = list(partition_cols)
+        self.fmt = fmt
+
+    def write(self, df, name='part'):
+        """
+        This function saves a data frame on the store. The partition columns
+        are kept on the files, the directories are only used to select them
+        @param df: data frame with all the partition columns
+        @param name: name of the file inside each partition, a file with the
+        same name on the same partition is replaced
+        @return: n/a
+        """
+        if len(df) == 0:
+            return
+
+        for values, part in df.groupby(self.partition_cols, sort=False):
+            # categorical columns give empty groups for unused categories
+            if len(part) == 0:
+                continue
+            if not isinstance(values, tuple):
+                values = (values,)
+
+            part_dir = os.path.join(self.root, *['%s=%s' % (col, value)
+                                                 for col, value in
+                                                 zip(self.partition_cols,
+                                                     values)])
+            if not os.path.isdir(part_dir):
+                os.makedirs(part_dir)
+
+            path = os.path.join(part_dir, name + self.FORMATS[self.fmt])
+            if self.fmt == 'parquet':
+                part.to_parquet(path)
+            else:
+                part.reset_index(drop=True).to_feather(path)
+
+    def partitions(self, filters=None):
+        """
+        This function lists the partitions that match the filters
+        @param filters: dictionary with the allowed values of some partition
+        columns. Ex: {'Country': ['ES', 'PT'], 'year': [2013, 2014]}
+        @return: list with the directories of the matching partitions
+        """
+        filters = filters or {}
+        allowed = [set(str(value) for value in filters[col])
+                   if col in filters else None
+                   for col in self.partition_cols]
+
+        pattern = os.path.join(self.root, *['%s=*' % col
+                                            for col in self.partition_cols])
+
+        selected = []
+        for part_dir in sorted(glob.glob(pattern)):
+            names = os.path.relpath(part_dir, self.root).split(os.sep)
+            values = [name.split('=', 1)[1] for name in names]
+            if all(values_ok is None or value in values_ok
+                   for value, values_ok in zip(values, allowed)):
+                selected.append(part_dir)
+
+        return selected
+
+    def read(self, filters=None, columns=None):
+        """
+        This function reads the data of the partitions that match the filters
+        @param filters: dictionary with the allowed values of some partition
+        columns. Ex: {'Country': ['ES'], 'year': range(2010, 2015)}
+        @param columns: list of columns to read or None to read all of them
+        @return: data frame with the selected data
+        """
+        filters = filters or {}
+
+        # filters on columns that are not partitions are done after reading
+        extra = [col for col in filters if col not in self.partition_cols]
+        read_columns = columns
+        if columns is not None:
+            read_columns = list(columns) + [col for col in extra
+                                            if col not in columns]
+
+        frames = []
+        for part_dir in self.partitions(filters):
+            for path in sorted(glob.glob(os.path.join(
+                    part_dir, '*' + self.FORMATS[self.fmt]))):
+                if self.fmt == 'parquet':
+                    frames.append(pd.read_parquet(path, columns=read_columns))
+                else:
+                    frames.append(pd.read_feather(path, columns=read_columns))
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames)
+        for col in extra:
+            df = df[df[col].isin(filters[col])]
+
+        if columns is not None:
+            df = df[list(columns)]
+
+        return df
+
+    def clear(self):
+        """
+        This function removes all the data from the store
+        @return: n/a
+        """
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
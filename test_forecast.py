@@ -0,0 +1,83 @@
+"""
+This module checks the monthly shares used by the forecasts when some
+months have no data
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# test framework
+import unittest
+# warning of the countries that are not fitted
+import warnings
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# long format of the monthly consumptions
+from monthlypowerconsumptions import MONTH_COLUMNS, long_monthly
+# function to check
+from forecast import monthly_shares
+
+
+def monthly_frame(rows):
+    """
+    Monthly data frame (country, 1,...,12, Sum, year) from a list of
+    (country, year, twelve values) tuples
+    """
+    df = pd.DataFrame([values for country, year, values in rows],
+                      columns=MONTH_COLUMNS, dtype='float64')
+    df.insert(0, 'country', [country for country, year, values in rows])
+    df['Sum'] = df[MONTH_COLUMNS].sum(axis=1)
+    df['year'] = [float(year) for country, year, values in rows]
+    return df
+
+
+class MonthlySharesTest(unittest.TestCase):
+
+    # share of each month, the same every year
+    profile = np.arange(1, 13, dtype='float64') / 78
+
+    def test_complete_years(self):
+        df = long_monthly(monthly_frame([('ES', 2010, 1000 * self.profile),
+                                         ('ES', 2011, 1100 * self.profile)]))
+        shares, totals = monthly_shares(df, ['ES'])
+
+        np.testing.assert_allclose(shares[0], self.profile)
+        np.testing.assert_allclose(totals['ES'].values, [1000, 1100])
+
+    def test_month_missing_on_some_years(self):
+        values = 1100 * self.profile
+        values[0] = np.nan
+        df = long_monthly(monthly_frame([('ES', 2010, 1000 * self.profile),
+                                         ('ES', 2011, values),
+                                         ('PT', 2010, 500 * self.profile)]))
+        shares, totals = monthly_shares(df, ['ES', 'PT'])
+
+        self.assertFalse(np.isnan(shares).any())
+        np.testing.assert_allclose(shares.sum(axis=1), [1, 1])
+        np.testing.assert_allclose(shares[0], self.profile)
+        # the missing January is completed with its share
+        np.testing.assert_allclose(totals.loc[2011, 'ES'], 1100)
+
+    def test_month_missing_on_all_years(self):
+        values = 1000 * self.profile
+        values[0] = np.nan
+        df = long_monthly(monthly_frame([('ES', 2010, values),
+                                         ('ES', 2011, values),
+                                         ('PT', 2010, 500 * self.profile)]))
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            shares, totals = monthly_shares(df, ['ES', 'PT'])
+
+        # only ES is not fitted
+        self.assertIn('ES (1)', str(caught[0].message))
+        self.assertTrue(np.isnan(shares[0]).all())
+        self.assertTrue(totals['ES'].isnull().all())
+        np.testing.assert_allclose(shares[1], self.profile)
+        np.testing.assert_allclose(totals.loc[2010, 'PT'], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
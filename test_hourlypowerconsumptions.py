@@ -0,0 +1,142 @@
+"""
+This module checks that the queries of HourlyPowerConsumptions never change
+the data frame they read and give the same results with every backend, on
+synthetic files (see benchmark.generate)
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# test framework
+import unittest
+# temporary directory for the synthetic files
+import os
+import shutil
+import tempfile
+# data frame operations
+import pandas as pd
+# synthetic files
+import benchmark
+# columnar store backend
+from store import ColumnarStore
+# class to check
+from hourlypowerconsumptions import HourlyPowerConsumptions
+
+
+def mutate(df):
+    """
+    Change in place all the numeric values and the column names of a query
+    result, as a caller could do
+    """
+    for pos in range(df.shape[1]):
+        dtype = df.dtypes.iloc[pos]
+        if pd.api.types.is_numeric_dtype(dtype) and \
+                not pd.api.types.is_bool_dtype(dtype):
+            df.iloc[:, pos] = -1
+    df.columns = ['x%d' % pos for pos in range(df.shape[1])]
+
+
+class SyntheticDataTest(unittest.TestCase):
+    """
+    Hourly data of two countries and one year, built once per test class
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir_path = tempfile.mkdtemp(prefix='demand-test-')
+        cls.countries, cls.years = benchmark.generate(cls.dir_path, 2, 1)
+        cls.hpc = HourlyPowerConsumptions(
+            os.path.join(cls.dir_path, ''), 'Hourly_*.xlsx',
+            skiprows=benchmark.HOURLY_SKIPROWS, save=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dir_path)
+
+
+class QueriesDoNotMutateTest(SyntheticDataTest):
+
+    def setUp(self):
+        self.hpc.set_engine('pandas')
+        self.hpc.clear_aggregates_cache()
+        self.snapshot = self.hpc.df.copy(deep=True)
+
+    def queries(self):
+        """
+        Name and call of each query method
+        """
+        hpc = self.hpc
+        country = self.countries[0]
+        year = self.years[-1]
+        return [
+            ('_select', lambda: hpc._select([country], [year])),
+            ('historical_daily_aggregates',
+             lambda: hpc.historical_daily_aggregates(country, year, 1)),
+            ('normalized_hourly_country_data',
+             lambda: hpc.normalized_hourly_country_data(country)),
+            ('normalized_hourly_countries_data',
+             lambda: hpc.normalized_hourly_countries_data(self.countries)),
+            ('get_daily_aggregates_countries',
+             lambda: hpc.get_daily_aggregates_countries(self.countries)),
+            ('get_monthly_aggregates_countries',
+             lambda: hpc.get_monthly_aggregates_countries(self.countries)),
+            ('get_hourly_aggregates_countries',
+             lambda: hpc.get_hourly_aggregates_countries(self.countries)),
+            ('get_hourly_prototype_countries',
+             lambda: hpc.get_hourly_prototype_countries(self.countries)),
+            ('get_hourly_prototype_weekday_countries',
+             lambda: hpc.get_hourly_prototype_weekday_countries(
+                 'Monday', self.countries))]
+
+    def check_queries(self):
+        for name, query in self.queries():
+            mutate(query())
+            self.assertTrue(self.hpc.df.equals(self.snapshot), name)
+
+    def test_pandas_engine(self):
+        self.check_queries()
+
+    def test_numpy_engine(self):
+        self.hpc.set_engine('numpy')
+        self.check_queries()
+
+    def test_memoized_daily_aggregates(self):
+        for engine in ['pandas', 'numpy']:
+            self.hpc.set_engine(engine)
+            first = self.hpc.get_daily_aggregates_countries(self.countries)
+            expected = first.copy(deep=True)
+            mutate(first)
+
+            # the second call is answered by the memoized data frame
+            again = self.hpc.get_daily_aggregates_countries(self.countries)
+            self.assertEqual(self.hpc.aggregates_cache_info()['hits'], 1)
+            self.assertTrue(again.equals(expected), engine)
+            self.assertTrue(self.hpc.df.equals(self.snapshot), engine)
+            self.hpc.clear_aggregates_cache()
+
+
+class BackendsTest(SyntheticDataTest):
+
+    def test_historical_daily_aggregates(self):
+        country = self.countries[0]
+        year = self.years[-1]
+        store = ColumnarStore(os.path.join(self.dir_path, 'store'))
+        self.hpc.save_to_store(store)
+
+        self.hpc.set_engine('pandas')
+        expected = self.hpc.historical_daily_aggregates(country, year, 1)
+        self.assertTrue(expected['date'].is_monotonic_increasing)
+
+        self.hpc.set_engine('numpy')
+        pd.testing.assert_frame_equal(
+            self.hpc.historical_daily_aggregates(country, year, 1), expected)
+        self.hpc.set_engine('pandas')
+
+        pd.testing.assert_frame_equal(
+            HourlyPowerConsumptions.from_store(
+                store).historical_daily_aggregates(country, year, 1),
+            expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
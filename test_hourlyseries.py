@@ -0,0 +1,77 @@
+"""
+This module checks the UTC hours of the long format view of the hourly
+consumptions on the days the clock changes
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# test framework
+import unittest
+# data frame operations
+import pandas as pd
+# array operations
+import numpy as np
+# columns with the hourly consumptions
+from hourlypowerconsumptions import HOURS, DST_HOUR
+# class to check
+from hourlyseries import HourlySeries
+
+# a country on CET/CEST and one that is not, their files use CET/CEST
+COUNTRIES = ['ES', 'PT']
+DAYS = ['2010-03-27', '2010-03-28', '2010-10-31', '2010-11-01']
+
+
+def hourly_frame():
+    """
+    Hourly data frame with all the hours of DAYS for each of COUNTRIES, the
+    extra hour of October only on its day and the missing hour of March
+    filled with the previous one as the files are parsed
+    """
+    rows = []
+    for country in COUNTRIES:
+        for day in DAYS:
+            values = list(np.arange(1, 25, dtype='float64'))
+            extra = 25.0 if day == '2010-10-31' else np.nan
+            if day == '2010-03-28':
+                values[2] = values[1]
+            rows.append([country, pd.Timestamp(day)] + values + [extra])
+    return pd.DataFrame(rows, columns=['Country', 'date'] + HOURS +
+                        [DST_HOUR])
+
+
+class HourlySeriesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.series = HourlySeries(hourly_frame())
+
+    def day(self, country, day):
+        """
+        Values of a local (CET/CEST) day of a country
+        """
+        start = pd.Timestamp(day)
+        end = start + pd.Timedelta(days=1)
+        return self.series.country_range(
+            country, start.tz_localize('Europe/Brussels'),
+            end.tz_localize('Europe/Brussels')).index
+
+    def test_dst_days(self):
+        for country in COUNTRIES:
+            # the filled hour of March is removed, the 3B hour is kept
+            self.assertEqual(len(self.day(country, '2010-03-28')), 23)
+            self.assertEqual(len(self.day(country, '2010-10-31')), 25)
+            self.assertEqual(len(self.day(country, '2010-03-27')), 24)
+            self.assertEqual(len(self.day(country, '2010-11-01')), 24)
+
+    def test_consecutive_hours(self):
+        for country in COUNTRIES:
+            times = self.series.country_range(country).index
+            self.assertEqual(len(times), 24 * len(DAYS))
+            self.assertTrue(times.is_unique)
+            self.assertEqual(times[0], pd.Timestamp('2010-03-26 23:00',
+                                                    tz='UTC'))
+            self.assertIn(pd.Timestamp('2010-10-31 01:00', tz='UTC'), times)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+This module provides functions to check the hourly consumptions parsed from
+https://www.entsoe.eu/ files before they are used
+"""
+__author__ = 'mtolos'
+__version__ = "1.0"
+__email__ = "mtolos@tid.es"
+
+# data frame operations
+import pandas as pd
+
+# columns of the validation report, one row per file
+REPORT_COLUMNS = ['file', 'rows', 'quarantined', 'non_numeric', 'negative',
+                  'outliers', 'dst_filled', 'gaps', 'dst_hours']
+
+
+def spring_forward(days):
+    """
+    This function finds the days the clock goes forward, the last Sunday of
+    March
+    @param days: series with the days
+    @return: boolean series
+    """
+    days = pd.to_datetime(days, errors='coerce')
+    return ((days.dt.month == 3) & (days.dt.weekday == 6) &
+            (days.dt.day >= 25)).fillna(False).astype(bool)
+
+
+def validate_hourly(wb, columns, file_name='', outlier_factor=4.0,
+                    dst_column=None, day_column='Day', spring_hour='H03'):
+    """
+    This function checks all the hourly columns of a parsed file at once and
+    converts them to numbers. Rows with values that are not numbers or that
+    are negative are quarantined. Outliers (values more than outlier_factor
+    times over or under the median of the country in the file), the missing
+    spring_hour of the day the clock goes forward (to be filled) and the
+    other missing hours are only flagged on the 'outlier', 'dst_filled' and
+    'gap' columns
+    @param wb: data frame of a file with the hourly columns not yet filled
+    @param columns: hourly columns. Ex: ['H01',...,'H24']
+    @param file_name: name of the file for the report
+    @param outlier_factor: how many times over or under the median a value
+    has to be to flag it as outlier
+    @param dst_column: column with the extra hour of the day the clock goes
+    back or None, it is converted to numbers but not checked
+    @param day_column: column with the day of each row
+    @param spring_hour: hour that does not exist the day the clock goes
+    forward
+    @return: tuple with (clean data frame, quarantined data frame with a
+    'reason' column, dictionary with the report of the file)
+    """
+    raw = wb[columns]
+    values = raw.apply(pd.to_numeric, errors='coerce')
+
+    non_numeric = (raw.notnull() & values.isnull()).any(axis=1)
+    negative = (values < 0).any(axis=1)
+
+    # only the missing spring_hour of the day of the change of hour in March
+    # is filled later, the other missing hours are gaps of the data
+    missing = raw.isnull()
+    dst_filled = (missing.sum(axis=1) == 1) & missing[spring_hour] & \
+        spring_forward(wb[day_column])
+    gap = missing.any(axis=1) & ~dst_filled
+
+    # consumptions very far from the usual level of the country
+    level = values.median(axis=1).groupby(wb['Country']).transform('median')
+    outlier = (values.gt(level * outlier_factor, axis=0) |
+               values.lt(level / outlier_factor, axis=0)).any(axis=1)
+
+    wb = wb.copy()
+    for column in columns:
+        wb[column] = values[column]
+    if dst_column is not None:
+        wb[dst_column] = pd.to_numeric(wb[dst_column], errors='coerce')
+    wb['outlier'] = outlier
+    wb['dst_filled'] = dst_filled
+    wb['gap'] = gap
+
+    bad = non_numeric | negative
+    quarantine = wb[bad].copy()
+    quarantine['reason'] = (non_numeric[bad].map({True: 'non_numeric',
+                                                  False: ''}) +
+                            (non_numeric & negative)[bad].map({True: ',',
+                                                               False: ''}) +
+                            negative[bad].map({True: 'negative',
+                                               False: ''}))
+
+    report = {'file': file_name, 'rows': len(wb),
+              'quarantined': int(bad.sum()),
+              'non_numeric': int(non_numeric.sum()),
+              'negative': int(negative.sum()),
+              'outliers': int((outlier & ~bad).sum()),
+              'dst_filled': int((dst_filled & ~bad).sum()),
+              'gaps': int((gap & ~bad).sum()),
+              'dst_hours': (int(wb[dst_column].notnull().sum())
+                            if dst_column is not None else 0)}
+
+    return wb[~bad], quarantine, report
+
+
+def report_frame(reports):
+    """
+    This function builds the validation report of several files
+    @param reports: list of dictionaries built by validate_hourly
+    @return: data frame with one row per file
+    """
+    return pd.DataFrame(list(reports), columns=REPORT_COLUMNS)